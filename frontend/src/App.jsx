@@ -428,9 +428,13 @@ function App() {
     setShowDepositModal(true);
   };
 
-  const openStockDetail = (stock) => {
+  const openStockDetail = async (stock) => {
     setSelectedStock(stock);
     setShowStockDetailModal(true);
+    if (!stock.price_history) {
+      const details = await stockService.getById(stock.id);
+      if (details) setSelectedStock({ ...stock, ...details });
+    }
   };
 
   if (!currentUser) {
@@ -1,10 +1,9 @@
-import { apiCall } from './api';
+import { apiCall, fetchAllPages } from './api';
 
 export const accountService = {
   async getAll() {
-    const response = await apiCall('/accounts/');
-    if (response.ok) return response.json();
-    return [];
+    const items = await fetchAllPages('/accounts/');
+    return items || [];
   },
 
   async create(accountData) {
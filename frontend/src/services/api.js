@@ -14,4 +14,20 @@ export const apiCall = async (endpoint, options = {}) => {
     console.error(`API call failed: ${endpoint}`, error);
     throw error;
   }
-};
\ No newline at end of file
+};
+
+// List endpoints return one page at a time and put the next page's cursor in
+// X-Next-Cursor; follow it so callers always get the complete list.
+export const fetchAllPages = async (endpoint, pageSize = 500) => {
+  const items = [];
+  const separator = endpoint.includes('?') ? '&' : '?';
+  let cursor = null;
+  do {
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await apiCall(`${endpoint}${separator}limit=${pageSize}${cursorParam}`);
+    if (!response.ok) return null;
+    items.push(...(await response.json()));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+};
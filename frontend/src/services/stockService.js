@@ -1,10 +1,15 @@
-import { apiCall } from './api';
+import { apiCall, fetchAllPages } from './api';
 
 export const stockService = {
   async getAll() {
-    const response = await apiCall('/stocks');
+    const items = await fetchAllPages('/stocks/');
+    return items || [];
+  },
+
+  async getById(stockId) {
+    const response = await apiCall(`/stocks/${stockId}`);
     if (response.ok) return response.json();
-    return [];
+    return null;
   },
 
   async getTopPerformers(limit = 10) {
@@ -1,4 +1,4 @@
-import { apiCall } from './api';
+import { apiCall, fetchAllPages } from './api';
 
 export const userService = {
   async login(email, password) {
@@ -10,9 +10,8 @@ export const userService = {
   },
 
   async getAll() {
-    const response = await apiCall('/users/');
-    if (response.ok) return response.json();
-    return [];
+    const items = await fetchAllPages('/users/');
+    return items || [];
   },
 
   async create(userData) {
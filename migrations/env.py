@@ -13,6 +13,7 @@ import src.stocks.models
 import src.trades.models
 import src.users.models
 import src.positions.models
+import src.feeds.models
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,72 @@
+"""add trader leaderboard
+
+Revision ID: b7e3f1a9c2d4
+Revises: a4c9d2e1f083
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3f1a9c2d4"
+down_revision: Union[str, Sequence[str], None] = "a4c9d2e1f083"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS trader_leaderboard (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE ON UPDATE CASCADE,
+            total_accounts INTEGER NOT NULL DEFAULT 0,
+            total_positions INTEGER NOT NULL DEFAULT 0,
+            total_invested DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+            current_value DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+            profit_loss DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+            return_percentage DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trader_leaderboard_return_percentage ON trader_leaderboard (return_percentage)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trades_account_id_stock_id ON trades (account_id, stock_id)")
+    op.execute(
+        """
+        INSERT INTO trader_leaderboard (user_id, total_accounts, total_positions, total_invested, current_value, profit_loss, return_percentage)
+        SELECT
+            v.user_id,
+            (SELECT count(*) FROM accounts a2 WHERE a2.user_id = v.user_id),
+            count(*),
+            sum(v.quantity * v.avg_price),
+            sum(v.quantity * v.price),
+            sum(v.quantity * v.price) - sum(v.quantity * v.avg_price),
+            (sum(v.quantity * v.price) - sum(v.quantity * v.avg_price)) / sum(v.quantity * v.avg_price) * 100
+        FROM (
+            SELECT
+                a.user_id,
+                p.quantity,
+                s.average_price AS price,
+                COALESCE((
+                    SELECT sum(t.amount) / NULLIF(sum(t.quantity), 0)
+                    FROM trades t
+                    WHERE t.account_id = p.account_id AND t.stock_id = p.stock_id AND t.type = 'BUY_STOCK'
+                ), 0.0) AS avg_price
+            FROM positions p
+            JOIN accounts a ON a.id = p.account_id
+            JOIN stocks s ON s.id = p.stock_id
+            WHERE p.quantity > 0
+        ) v
+        GROUP BY v.user_id
+        HAVING sum(v.quantity * v.avg_price) > 0
+        ON CONFLICT (user_id) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_trades_account_id_stock_id")
+    op.execute("DROP TABLE IF EXISTS trader_leaderboard")
@@ -0,0 +1,25 @@
+"""add stock version
+
+Revision ID: c5d8e2f4a1b7
+Revises: b7e3f1a9c2d4
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d8e2f4a1b7"
+down_revision: Union[str, Sequence[str], None] = "b7e3f1a9c2d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE stocks ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE stocks DROP COLUMN IF EXISTS version")
@@ -0,0 +1,81 @@
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable
+
+
+class Recorder:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: list[float] = []
+        self.errors = 0
+
+    async def measure(self, operation: Callable[[], Awaitable]):
+        started = time.perf_counter()
+        try:
+            await operation()
+        except Exception:
+            self.errors += 1
+            return
+        self.latencies.append(time.perf_counter() - started)
+
+    def summary(self, elapsed: float) -> str:
+        if not self.latencies:
+            return f"{self.name:<24} no successful calls ({self.errors} errors)"
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return (
+            f"{self.name:<24} {len(ordered) / elapsed:9.1f}/s  "
+            f"p50 {statistics.median(ordered) * 1000:8.2f} ms  "
+            f"p95 {p95 * 1000:8.2f} ms  errors {self.errors}"
+        )
+
+
+async def run_workers(duration: float, workers: list[tuple[Recorder, int, Callable[[], Awaitable]]]) -> float:
+    deadline = time.perf_counter() + duration
+
+    async def loop(recorder: Recorder, operation: Callable[[], Awaitable]):
+        while time.perf_counter() < deadline:
+            await recorder.measure(operation)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(recorder, operation) for recorder, count, operation in workers for _ in range(count)))
+    return time.perf_counter() - started
+
+
+def timeit(operation: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    return (time.perf_counter() - started) / repeat
+
+
+async def asgi_request(app, method: str, path: str, headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    response: dict = {"body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {name.decode(): value.decode() for name, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.benchmark_common import Recorder, asgi_request, run_workers
+from src.compression import brotli
+from src.database import async_session_maker
+from src.main import app
+from src.trades.models import Trade
+
+
+async def busiest_account() -> int:
+    async with async_session_maker() as session:
+        query = select(Trade.account_id).group_by(Trade.account_id).order_by(func.count(Trade.id).desc()).limit(1)
+        account_id = await session.scalar(query)
+    if account_id is None:
+        raise SystemExit("No trades found; run scripts/seed_demo_data.py first.")
+    return account_id
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bandwidth and latency of history-heavy endpoints per Content-Encoding.")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    account_id = await busiest_account()
+    paths = ["/stocks/?include=history&limit=500", f"/trades/account/{account_id}"]
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    for path in paths:
+        print(path)
+        for encoding in encodings:
+            headers = {"Accept-Encoding": encoding}
+            sizes = []
+
+            async def call():
+                status, response_headers, body = await asgi_request(app, "GET", path, headers)
+                if status != 200:
+                    raise RuntimeError(f"{path} returned {status}")
+                sizes.append(len(body))
+
+            recorder = Recorder(encoding)
+            elapsed = await run_workers(args.duration, [(recorder, args.concurrency, call)])
+            average = sum(sizes) / len(sizes) if sizes else 0
+            print(f"  {recorder.summary(elapsed)}  {average / 1024:9.1f} KiB/response")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from sqlalchemy import select
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.benchmark_common import Recorder, run_workers
+from src.accounts.models import Account
+from src.database import async_session_maker
+from src.stocks.models import Stock
+from src.trades.schemas import MoneyTradeCreate, StockTradeCreate
+from src.trades.services import TradeService
+from src.users.models import User
+from src.users.security import hash_password, verify_password_sync
+from src.users.services import UserService
+
+BENCH_EMAIL = "login-benchmark@fintechdemo.app"
+BENCH_PASSWORD = "BenchPass123"
+
+
+async def prepare() -> tuple[int, Stock]:
+    async with async_session_maker() as session:
+        stock = (await session.scalars(select(Stock).where(Stock.average_price > 0).order_by(Stock.id))).first()
+        if stock is None:
+            raise SystemExit("No stocks found; run scripts/seed_demo_data.py first.")
+        user = (await session.scalars(select(User).where(User.email == BENCH_EMAIL))).first()
+        if user is None:
+            user = User(name="Login Benchmark", email=BENCH_EMAIL, password=await hash_password(BENCH_PASSWORD), type="user")
+            session.add(user)
+            await session.flush()
+            account = Account(user_id=user.id, name="Benchmark Account")
+            session.add(account)
+            await session.commit()
+            await TradeService.process_money_trade(MoneyTradeCreate(account_id=account.id, type="DEPOSIT", amount=10_000_000), session)
+        account = (await session.scalars(select(Account).where(Account.user_id == user.id))).first()
+        return account.id, stock
+
+
+async def pooled_login():
+    async with async_session_maker() as session:
+        if not await UserService.verify_password(BENCH_EMAIL, BENCH_PASSWORD, session):
+            raise RuntimeError("login failed")
+
+
+async def inline_login():
+    async with async_session_maker() as session:
+        user = await UserService.get_user_by_email(BENCH_EMAIL, session)
+        if not user or not verify_password_sync(BENCH_PASSWORD, user.password):
+            raise RuntimeError("login failed")
+
+
+def round_trip(account_id: int, stock: Stock):
+    async def trade():
+        async with async_session_maker() as session:
+            for side in ("BUY_STOCK", "SELL_STOCK"):
+                await TradeService.process_stock_trade(
+                    StockTradeCreate(account_id=account_id, stock_id=stock.id, type=side, quantity=1, price=stock.average_price),
+                    session,
+                )
+
+    return trade
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Login throughput while trades run concurrently.")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login workers")
+    parser.add_argument("--traders", type=int, default=8, help="concurrent trade workers")
+    args = parser.parse_args()
+
+    account_id, stock = await prepare()
+    for mode, login in (("thread pool", pooled_login), ("inline", inline_login)):
+        logins, trades = Recorder("logins"), Recorder("trade round trips")
+        elapsed = await run_workers(args.duration, [(logins, args.logins, login), (trades, args.traders, round_trip(account_id, stock))])
+        print(f"[{mode}]")
+        print(logins.summary(elapsed))
+        print(trades.summary(elapsed))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.benchmark_common import Recorder, asgi_request, run_workers
+from src.accounts.models import Account
+from src.database import DATABASE_URL, engine_options, get_async_session, get_read_session
+from src.main import app
+
+
+def endpoint(path: str):
+    async def call():
+        status, _, _ = await asgi_request(app, "GET", path)
+        if status != 200:
+            raise RuntimeError(f"{path} returned {status}")
+    return call
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Latency of /stocks/ and an account balance with and without connection pooling.")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    for label, pooled in (("pool on", True), ("pool off", False)):
+        engine = create_async_engine(DATABASE_URL, **engine_options(pooled))
+        maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def session_override():
+            async with maker() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = session_override
+        app.dependency_overrides[get_read_session] = session_override
+        async with maker() as session:
+            account_id = await session.scalar(select(Account.id).order_by(Account.id).limit(1))
+        if account_id is None:
+            raise SystemExit("No accounts found; run scripts/seed_demo_data.py first.")
+
+        stocks, balance = Recorder("GET /stocks/"), Recorder("GET balance")
+        elapsed = await run_workers(args.duration, [
+            (stocks, args.concurrency // 2, endpoint("/stocks/")),
+            (balance, args.concurrency - args.concurrency // 2, endpoint(f"/trades/account/{account_id}/balance")),
+        ])
+        print(f"[{label}]")
+        print(stocks.summary(elapsed))
+        print(balance.summary(elapsed))
+        await engine.dispose()
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from scripts.benchmark_common import timeit
+from scripts.seed_demo_data import price_history
+from src.positions.schemas import PositionDetailResponse
+from src.responses import fast_response
+from src.stocks.schemas import StockListResponse
+from src.trades.schemas import TradeResponse
+
+
+def position_rows(count: int) -> list[PositionDetailResponse]:
+    now = datetime.now(timezone.utc)
+    return [
+        PositionDetailResponse(
+            account_id=1, stock_id=index + 1, stock_name=f"Stock {index}", stock_ticker=f"S{index}",
+            quantity=10.0 + index, average_purchase_price=90.5, current_market_price=100.25,
+            total_invested=905.0, current_value=1002.5, unrealized_profit_loss=97.5,
+            unrealized_profit_loss_percentage=10.77, created_at=now, updated_at=now,
+        )
+        for index in range(count)
+    ]
+
+
+def stock_rows(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {"id": index + 1, "name": f"Stock {index}", "symbol": f"S{index}", "average_price": 100.0 + index,
+         "price_history": price_history(100.0 + index, index), "updated_at": now}
+        for index in range(count)
+    ]
+
+
+def trade_rows(count: int) -> list[dict]:
+    start = datetime.now(timezone.utc)
+    return [
+        {"id": index + 1, "account_id": 1, "type": "BUY_STOCK", "amount": 905.0, "stock_id": index % 50 + 1,
+         "quantity": 10.0, "price": 90.5, "description": None, "from_account_id": None, "to_account_id": None,
+         "timestamp": start - timedelta(minutes=index)}
+        for index in range(count)
+    ]
+
+
+def default_path(annotation, content, exclude_unset: bool = False):
+    # What FastAPI does for a route that returns data under a response_model.
+    field = create_model_field(name="Response", type_=annotation, mode="serialization")
+
+    def render() -> bytes:
+        encoded = asyncio.run(serialize_response(field=field, response_content=content, exclude_unset=exclude_unset, is_coroutine=True))
+        return JSONResponse(encoded).body
+
+    return render
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization time of large responses on the default and fast JSON paths.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    positions, stocks, trades = position_rows(args.rows), stock_rows(args.rows), trade_rows(args.rows)
+    # Before, the trade history route returned ORM objects read through from_attributes.
+    trade_objects = [SimpleNamespace(**trade) for trade in trades]
+    cases = [
+        ("positions", default_path(list[PositionDetailResponse], positions), lambda: fast_response(positions).body),
+        ("stocks + price_history", default_path(list[StockListResponse], stocks, exclude_unset=True), lambda: fast_response(stocks).body),
+        ("trade history", default_path(list[TradeResponse], trade_objects), lambda: fast_response(trades).body),
+    ]
+    print(f"{args.rows} rows, mean of {args.repeat} runs")
+    for name, before, after in cases:
+        before_seconds, after_seconds = timeit(before, args.repeat), timeit(after, args.repeat)
+        print(
+            f"{name:<24} default {before_seconds * 1000:8.1f} ms  fast {after_seconds * 1000:8.1f} ms  "
+            f"x{before_seconds / after_seconds:5.1f}  {len(after()) / 1e6:6.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
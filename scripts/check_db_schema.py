@@ -10,6 +10,7 @@ if str(ROOT_DIR) not in sys.path:
 
 from src.database import Base, engine
 import src.accounts.models  # noqa: F401
+import src.feeds.models  # noqa: F401
 import src.positions.models  # noqa: F401
 import src.stocks.models  # noqa: F401
 import src.trades.models  # noqa: F401
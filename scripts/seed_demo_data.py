@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from sqlalchemy import select
+from sqlalchemy.orm import undefer
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
@@ -17,6 +18,7 @@ from src.trades.models import Trade
 from src.trades.schemas import MoneyTradeCreate, StockTradeCreate
 from src.trades.services import TradeService
 from src.users.models import User
+from src.users.security import hash_password
 
 
 DEMO_PASSWORD = "DemoPass123"
@@ -78,7 +80,7 @@ async def get_or_create_user(session, user_data: dict) -> User:
     if user:
         return user
 
-    user = User(**user_data)
+    user = User(**{**user_data, "password": await hash_password(user_data["password"])})
     session.add(user)
     await session.commit()
     await session.refresh(user)
@@ -98,12 +100,12 @@ async def normalize_legacy_demo_emails(session) -> None:
             continue
 
         legacy_user.email = replacement_email
-        legacy_user.password = DEMO_PASSWORD
+        legacy_user.password = await hash_password(DEMO_PASSWORD)
         await session.commit()
 
 
 async def get_or_create_stock(session, name: str, symbol: str, average_price: float, seed: int) -> Stock:
-    result = await session.scalars(select(Stock).where(Stock.symbol == symbol))
+    result = await session.scalars(select(Stock).where(Stock.symbol == symbol).options(undefer(Stock.price_history)))
     stock = result.first()
     if stock:
         if not stock.price_history or len(stock.price_history) < 30:
@@ -3,5 +3,6 @@ from src.accounts.models import Account
 from src.stocks.models import Stock
 from src.positions.models import Position
 from src.trades.models import Trade
+from src.feeds.models import TraderLeaderboard
 
-__all__ = ['User', 'Account', 'Stock', 'Position', 'Trade']
\ No newline at end of file
+__all__ = ['User', 'Account', 'Stock', 'Position', 'Trade', 'TraderLeaderboard']
\ No newline at end of file
@@ -16,5 +16,5 @@ class Account(Base):
     user: Mapped["User"] = relationship("User", back_populates="accounts")  # type: ignore
 
     #Relationships-Parent
-    positions: Mapped[list["Position"]] = relationship("Position", back_populates="account",cascade="all, delete-orphan")  # type: ignore
-    trades: Mapped[list["Trade"]] = relationship("Trade", back_populates="account", cascade="all, delete-orphan", foreign_keys="Trade.account_id")  # type: ignore
\ No newline at end of file
+    positions: Mapped[list["Position"]] = relationship("Position", back_populates="account",cascade="all, delete-orphan", passive_deletes=True)  # type: ignore
+    trades: Mapped[list["Trade"]] = relationship("Trade", back_populates="account", cascade="all, delete-orphan", passive_deletes=True, foreign_keys="Trade.account_id")  # type: ignore
\ No newline at end of file
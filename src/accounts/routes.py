@@ -1,27 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from src.database import get_async_session
 from src.accounts.models import Account
-from src.accounts.schemas import AccountResponse, AccountCreate, AccountUpdate
+from src.accounts.schemas import AccountResponse, AccountSummaryResponse, AccountCreate, AccountUpdate
 from src.accounts.services import AccountService
 from src.users.models import User
+from src.pagination import PageParams
+from src.http_cache import account_etag
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
 @router.get("/", response_model=List[AccountResponse])
-async def get_accounts(session: AsyncSession = Depends(get_async_session)):
-    result = await AccountService.get_all_accounts(session)
-    return result
+async def get_accounts(
+    response: Response,
+    user_id: int | None = Query(None, description="Only accounts owned by this user"),
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session)):
+    result = await AccountService.get_all_accounts(session, user_id, page)
+    result.apply_headers(response)
+    return result.items
 
 @router.post("/", response_model=AccountResponse, status_code=201)
 async def create_account(payload: AccountCreate, session: AsyncSession = Depends(get_async_session)):
     new_account = await AccountService.create_account(payload, session)
     return new_account
 
-@router.get("/{account_id}", response_model=AccountResponse)
+@router.get("/{account_id}", response_model=AccountSummaryResponse, dependencies=[Depends(account_etag)])
 async def get_account(account_id: int, session: AsyncSession = Depends(get_async_session)):
     result = await AccountService.get_account_summary(account_id ,session)
     return result
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, PositiveInt, Field
 from datetime import datetime
 from typing import Optional
+from src.positions.schemas import PositionDetailResponse
 
 
 class AccountCreate(BaseModel):
@@ -18,5 +19,14 @@ class AccountResponse(BaseModel):
         from_attributes = True
 
 
+class AccountSummaryResponse(AccountResponse):
+    cash_balance: float = Field(..., description="Cash available in the account")
+    portfolio_value: float = Field(..., description="Current market value of all positions")
+    total_account_value: float = Field(..., description="Cash plus portfolio value")
+    num_positions: int
+    unrealized_profit_loss: float
+    positions: list[PositionDetailResponse] = Field(default_factory=list, description="Open positions, largest first")
+
+
 class AccountUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=4, max_length=40, examples=["Main account"])
\ No newline at end of file
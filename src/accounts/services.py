@@ -1,10 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, func, true
 from fastapi import HTTPException
 from src.accounts.models import Account
 from src.users.models import User
 from src.accounts.schemas import AccountCreate, AccountUpdate
 from sqlalchemy.exc import IntegrityError
+from src.pagination import Page, PageParams, paginate
+from typing import Optional
+
+ACCOUNT_SORT_FIELDS = {"id": Account.id, "name": Account.name, "user_id": Account.user_id, "created_at": Account.created_at}
 
 class AccountService:
     @staticmethod
@@ -34,10 +38,11 @@ class AccountService:
         return account
     
     @staticmethod
-    async def get_all_accounts(session: AsyncSession) -> list[Account]:
+    async def get_all_accounts(session: AsyncSession, user_id: Optional[int] = None, page: Optional[PageParams] = None) -> Page:
         query = select(Account)
-        result = await session.scalars(query)
-        return list(result.all())
+        if user_id is not None:
+            query = query.where(Account.user_id == user_id)
+        return await paginate(session, query, Account.id, ACCOUNT_SORT_FIELDS, page)
     
     @staticmethod
     async def get_user_accounts(user_id: int, session: AsyncSession) -> list[Account]:
@@ -66,34 +71,82 @@ class AccountService:
     
     @staticmethod
     async def delete_account(account_id: int, session: AsyncSession) -> None:
+        from src.feeds.leaderboard import LeaderboardService
+        from src.feeds.profiles import invalidate_profiles
+        from src.feeds.trending import invalidate_trending
         account = await AccountService.get_account_by_id(account_id, session)
-        await session.delete(account)
+        await session.execute(delete(Account).where(Account.id == account_id))
+        await LeaderboardService.refresh_users([account.user_id], session)
         await session.commit()
+        invalidate_profiles([account.user_id])
+        await invalidate_trending([account.user_id])
     
     @staticmethod
     async def get_account_summary(account_id: int, session: AsyncSession) -> dict:
+        from src.trades.models import Trade
         from src.trades.services import TradeService
+        from src.positions.models import Position
         from src.positions.services import PositionService
-        account = await AccountService.get_account_by_id(account_id, session)
-        balance = await TradeService.calculate_balance(account_id, session)
-        try:
-            portfolio = await PositionService.get_portfolio_summary(account_id, session)
-            portfolio_value = portfolio.current_portfolio_value
-            num_positions = portfolio.total_positions
-            total_profit_loss = portfolio.total_unrealized_profit_loss
-        except Exception:
-            portfolio_value = 0.0
-            num_positions = 0
-            total_profit_loss = 0.0
-        total_value = balance + portfolio_value
+        cash = (
+            select(func.coalesce(func.sum(TradeService.signed_amount()), 0.0).label("balance"))
+            .where(Trade.account_id == account_id)
+            .cte("cash_balance")
+        )
+        positions = PositionService.valued_positions_query(Position.account_id == account_id).cte("valued_positions")
+        query = (
+            select(
+                Account.id,
+                Account.user_id,
+                Account.name,
+                Account.created_at,
+                cash.c.balance,
+                *[column.label(f"position_{column.name}") for column in positions.c],
+            )
+            .select_from(Account)
+            .join(cash, true())
+            .outerjoin(positions, positions.c.account_id == Account.id)
+            .where(Account.id == account_id)
+        )
+        result = await session.execute(query)
+        rows = result.all()
+        if not rows:
+            raise HTTPException(status_code=404, detail="Account not found")
+        
+        account = rows[0]
+        positions_detail = []
+        for row in rows:
+            if row.position_stock_id is None:
+                continue
+            invested = row.position_quantity * row.position_average_purchase_price
+            current_value = row.position_quantity * row.position_current_market_price
+            profit_loss = current_value - invested
+            positions_detail.append({
+                "account_id": account.id,
+                "stock_id": row.position_stock_id,
+                "stock_name": row.position_stock_name,
+                "stock_ticker": row.position_stock_ticker,
+                "quantity": row.position_quantity,
+                "average_purchase_price": row.position_average_purchase_price,
+                "current_market_price": row.position_current_market_price,
+                "total_invested": invested,
+                "current_value": current_value,
+                "unrealized_profit_loss": profit_loss,
+                "unrealized_profit_loss_percentage": (profit_loss / invested * 100) if invested > 0 else 0,
+                "created_at": row.position_created_at,
+                "updated_at": row.position_updated_at
+            })
+        positions_detail.sort(key=lambda position: position["current_value"], reverse=True)
+        
+        portfolio_value = sum(position["current_value"] for position in positions_detail)
         return {
-            "account_id": account.id,
-            "account_name": account.name,
+            "id": account.id,
+            "name": account.name,
             "user_id": account.user_id,
             "created_at": account.created_at,
-            "cash_balance": balance,
+            "cash_balance": account.balance,
             "portfolio_value": portfolio_value,
-            "total_account_value": total_value,
-            "num_positions": num_positions,
-            "unrealized_profit_loss": total_profit_loss
-        }
\ No newline at end of file
+            "total_account_value": account.balance + portfolio_value,
+            "num_positions": len(positions_detail),
+            "unrealized_profit_loss": sum(position["unrealized_profit_loss"] for position in positions_detail),
+            "positions": positions_detail
+        }
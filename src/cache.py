@@ -0,0 +1,49 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+
+class TTLCache(LRUCache):
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0):
+        super().__init__(maxsize)
+        self.ttl = ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = super().get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.pop(key)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        super().set(key, (time.monotonic() + (self.ttl if ttl is None else ttl), value))
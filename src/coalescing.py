@@ -0,0 +1,76 @@
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+
+from src.cache import TTLCache
+from src.config import settings
+from src.database import read_session
+
+_MISSING = object()
+
+
+class SingleFlight:
+    def __init__(self, name: str, ttl: float = 0.0, maxsize: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if self.ttl > 0:
+            cached = self._results.get(key, _MISSING)
+            if cached is not _MISSING:
+                self.cache_hits += 1
+                return cached
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so a caller that disconnects does not cancel the shared call.
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        # Runs when the shared task ends, even if every waiter was cancelled first.
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled():
+            return
+        # Retrieve the exception here so a failure nobody is left to await is not
+        # reported as "Task exception was never retrieved".
+        if task.exception() is not None:
+            return
+        if self.ttl > 0:
+            self._results.set(key, task.result())
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "in_flight": len(self._in_flight),
+        }
+
+
+flights: dict[str, SingleFlight] = {}
+
+
+def coalesce(name: str, func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    # The shared call opens its own session: it may outlive the request that started it.
+    flight = flights.setdefault(name, SingleFlight(name, settings.coalesce_ttl(name)))
+
+    @wraps(func)
+    async def wrapper(*args):
+        async def compute():
+            async with read_session() as session:
+                return await func(session, *args)
+        return await flight.do(args, compute)
+
+    return wrapper
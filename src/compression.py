@@ -0,0 +1,102 @@
+import asyncio
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+_executor = ThreadPoolExecutor(max_workers=settings.compression_workers, thread_name_prefix="compression")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.strip().lower().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding] = quality
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    wildcard = accepted.get("*", 0.0)
+    candidates = [(accepted.get(coding, wildcard), coding) for coding in available]
+    quality, coding = max(candidates, key=lambda candidate: candidate[0])
+    return coding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return (
+        content_type.startswith(COMPRESSIBLE_TYPES)
+        and not content_type.startswith("text/event-stream")
+        and "content-encoding" not in headers
+        # Routes opt out per response with Cache-Control: no-transform.
+        and "no-transform" not in headers.get("cache-control", "")
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.excluded_paths = tuple(settings.compression_excluded_paths_list)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            # Streamed bodies (SSE, chunked downloads) are passed through untouched.
+            if message.get("more_body", False) or not _compressible(headers) or len(body) < settings.compression_minimum_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                if len(body) >= settings.compression_thread_threshold:
+                    body = await asyncio.get_running_loop().run_in_executor(_executor, compress, body, encoding)
+                else:
+                    body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                # The encoded bytes differ from the identity body, so a strong ETag
+                # is downgraded to a weak one as RFC 9110 requires.
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 from pydantic import SecretStr
-from typing import Optional
+from typing import Literal, Optional
 from urllib.parse import urlparse, urlunparse
 
 current_directory = os.path.dirname(os.path.abspath(__file__))
@@ -21,10 +21,100 @@ class Settings(BaseSettings):
     db_name: Optional[str] = None
     cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000"
 
+    db_pool_enabled: bool = True
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 500
+    db_prepared_statement_cache_size: int = 500
+    db_pgbouncer_mode: bool = False
+
+    db_replica_urls: Optional[SecretStr] = None
+    db_replica_max_lag_seconds: float = 5.0
+    db_replica_lag_check_seconds: float = 1.0
+
+    market_sim_enabled: bool = False
+    market_sim_tick_seconds: float = 1.0
+    market_sim_drift: float = 0.05
+    market_sim_volatility: float = 0.25
+    market_sim_correlation: float = 0.3
+    market_sim_time_scale: float = 1.0
+    market_sim_universe_refresh_ticks: int = 60
+    market_sim_leaderboard_refresh_seconds: float = 30.0
+
+    correlation_refresh_seconds: float = 60.0
+
+    feed_cache_ttl_seconds: float = 5.0
+    trending_half_life_hours: float = 24.0
+    trader_profile_cache_ttl_seconds: float = 30.0
+    feed_stream_buffer_size: int = 1000
+
+    password_scrypt_n: int = 2 ** 14
+    password_scrypt_r: int = 8
+    password_scrypt_p: int = 1
+    password_hash_workers: int = 4
+
+    deletion_chunk_size: int = 5000
+
+    coalesce_default_ttl_seconds: float = 1.0
+    coalesce_route_ttls: str = "top_traders=2,trending_stocks=5,market_overview=2"
+
+    metrics_enabled: bool = True
+
+    query_guard_mode: Literal["off", "warn", "raise"] = "off"
+    query_budget_default: int = 0
+    query_budgets: str = ""
+    n_plus_one_threshold: int = 5
+
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    compression_thread_threshold: int = 256 * 1024
+    compression_workers: int = 2
+    compression_excluded_paths: str = ""
+
     @property
     def cors_origins_list(self) -> list[str]:
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
+    @property
+    def replica_database_urls(self) -> list[str]:
+        if not self.db_replica_urls:
+            return []
+        urls = self.db_replica_urls.get_secret_value().split(",")
+        return [self._to_asyncpg_url(url.strip()) for url in urls if url.strip()]
+
+    @property
+    def query_budgets_map(self) -> dict[str, int]:
+        budgets = {}
+        for entry in self.query_budgets.split(","):
+            if entry.strip():
+                route, _, budget = entry.rpartition("=")
+                budgets[route.strip()] = int(budget)
+        return budgets
+
+    def query_budget(self, route: str) -> Optional[int]:
+        return self.query_budgets_map.get(route, self.query_budget_default or None)
+
+    @property
+    def compression_excluded_paths_list(self) -> list[str]:
+        return [path.strip() for path in self.compression_excluded_paths.split(",") if path.strip()]
+
+    @property
+    def coalesce_route_ttls_map(self) -> dict[str, float]:
+        ttls = {}
+        for entry in self.coalesce_route_ttls.split(","):
+            if entry.strip():
+                name, _, ttl = entry.partition("=")
+                ttls[name.strip()] = float(ttl)
+        return ttls
+
+    def coalesce_ttl(self, name: str) -> float:
+        return self.coalesce_route_ttls_map.get(name, self.coalesce_default_ttl_seconds)
+
     @property
     def async_database_url(self) -> str:
         if self.database_url:
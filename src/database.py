@@ -1,5 +1,13 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+from uuid import uuid4
 
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.pool import NullPool
@@ -11,10 +19,100 @@ DATABASE_URL = s.async_database_url
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+
+def engine_options(pooled: bool | None = None) -> dict:
+    connect_args = {
+        "statement_cache_size": s.db_statement_cache_size,
+        "prepared_statement_cache_size": s.db_prepared_statement_cache_size,
+    }
+    if s.db_pgbouncer_mode:
+        # PgBouncer in transaction mode may run each transaction on a different
+        # server connection, so prepared statements must be unnamed and uncached.
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    if not (s.db_pool_enabled if pooled is None else pooled):
+        return {"poolclass": NullPool, "connect_args": connect_args}
+    return {
+        "pool_size": s.db_pool_size,
+        "max_overflow": s.db_max_overflow,
+        "pool_timeout": s.db_pool_timeout,
+        "pool_recycle": s.db_pool_recycle,
+        "pool_pre_ping": s.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_async_engine(DATABASE_URL, **engine_options())
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
+
+
+# A replica that has replayed everything it received is current even when the
+# primary has been idle, so only an unapplied WAL backlog counts as lag.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+REPLICA_CHECK_TIMEOUT_SECONDS = 2.0
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = create_async_engine(url, **engine_options())
+        self.session_maker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def current_lag(self) -> Optional[float]:
+        if time.monotonic() - self._checked_at < s.db_replica_lag_check_seconds:
+            return self.lag
+        async with self._lock:
+            if time.monotonic() - self._checked_at < s.db_replica_lag_check_seconds:
+                return self.lag
+            try:
+                async with self.engine.connect() as connection:
+                    lag = await asyncio.wait_for(connection.scalar(REPLICA_LAG_QUERY), REPLICA_CHECK_TIMEOUT_SECONDS)
+                # NULL means the server is not replaying WAL, i.e. it is not a replica.
+                self.lag = None if lag is None else float(lag)
+            except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+                self.lag = None
+            self._checked_at = time.monotonic()
+            return self.lag
+
+
+replicas = [Replica(url) for url in s.replica_database_urls]
+_next_replica = itertools.count()
+
+
+async def pick_replica() -> Optional[Replica]:
+    if not replicas:
+        return None
+    start = next(_next_replica)
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        lag = await replica.current_lag()
+        if lag is not None and lag <= s.db_replica_max_lag_seconds:
+            return replica
+    return None
+
+
+@asynccontextmanager
+async def read_session(strong: bool = False) -> AsyncGenerator[AsyncSession, None]:
+    replica = None if strong else await pick_replica()
+    async with (replica.session_maker if replica else async_session_maker)() as session:
+        yield session
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Read-only routes use a replica when one is current enough. Clients that must
+    # see their own writes send "X-Consistency: strong" to read from the primary.
+    async with read_session(strong=request.headers.get("x-consistency", "").lower() == "strong") as session:
+        yield session
@@ -0,0 +1,115 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, distinct
+from sqlalchemy.dialects.postgresql import insert
+from src.feeds.models import TraderLeaderboard
+from src.users.models import User
+from src.accounts.models import Account
+from src.positions.models import Position
+from src.positions.services import PositionService
+from typing import Iterable, List, Dict
+
+LEADERBOARD_COLUMNS = ["user_id", "total_accounts", "total_positions", "total_invested", "current_value", "profit_loss", "return_percentage"]
+
+
+class LeaderboardService:
+    @staticmethod
+    def _stats_query(*criteria):
+        positions = PositionService.valued_positions_query(*criteria).subquery()
+        invested = func.sum(positions.c.quantity * positions.c.average_purchase_price)
+        current = func.sum(positions.c.quantity * positions.c.current_market_price)
+        total_accounts = select(func.count(Account.id)).where(Account.user_id == positions.c.user_id).scalar_subquery()
+        return (
+            select(
+                positions.c.user_id,
+                total_accounts.label("total_accounts"),
+                func.count().label("total_positions"),
+                invested.label("total_invested"),
+                current.label("current_value"),
+                (current - invested).label("profit_loss"),
+                ((current - invested) / invested * 100).label("return_percentage"),
+            )
+            .group_by(positions.c.user_id)
+            .having(invested > 0)
+        )
+
+    @staticmethod
+    async def _refresh(session: AsyncSession, users=None):
+        criteria = [Account.user_id.in_(users)] if users is not None else []
+        stats = LeaderboardService._stats_query(*criteria)
+        existing = select(TraderLeaderboard.user_id).order_by(TraderLeaderboard.user_id).with_for_update()
+        stale = delete(TraderLeaderboard)
+        if users is not None:
+            existing = existing.where(TraderLeaderboard.user_id.in_(users))
+            stale = stale.where(TraderLeaderboard.user_id.in_(users))
+        # Concurrent refreshes (trades, price updates, the simulator) overlap on
+        # rows, so every refresh locks and writes them in user_id order to avoid
+        # deadlocking against another.
+        await session.execute(existing)
+        await session.execute(stale.where(TraderLeaderboard.user_id.not_in(select(stats.subquery().c.user_id))))
+        upsert = insert(TraderLeaderboard).from_select(LEADERBOARD_COLUMNS, stats.order_by(stats.selected_columns.user_id))
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={column: upsert.excluded[column] for column in LEADERBOARD_COLUMNS[1:]} | {"updated_at": func.now()},
+        )
+        await session.execute(upsert)
+
+    @staticmethod
+    async def refresh_users(user_ids: Iterable[int], session: AsyncSession):
+        user_ids = list(set(user_ids))
+        if user_ids:
+            await LeaderboardService._refresh(session, user_ids)
+
+    @staticmethod
+    async def refresh_stock_holders(stock_ids: Iterable[int], session: AsyncSession):
+        stock_ids = list(set(stock_ids))
+        if not stock_ids:
+            return
+        holders = (
+            select(distinct(Account.user_id))
+            .join(Position, Position.account_id == Account.id)
+            .where(Position.stock_id.in_(stock_ids), Position.quantity > 0)
+        )
+        await LeaderboardService._refresh(session, holders)
+
+    @staticmethod
+    async def holder_user_ids(stock_id: int, session: AsyncSession) -> List[int]:
+        query = select(distinct(Account.user_id)).join(Position, Position.account_id == Account.id).where(Position.stock_id == stock_id)
+        result = await session.scalars(query)
+        return list(result.all())
+
+    @staticmethod
+    async def rebuild(session: AsyncSession):
+        await LeaderboardService._refresh(session)
+        await session.commit()
+
+    @staticmethod
+    def top_query(limit: int):
+        return (
+            select(TraderLeaderboard.user_id, TraderLeaderboard.return_percentage)
+            .order_by(TraderLeaderboard.return_percentage.desc(), TraderLeaderboard.user_id)
+            .limit(limit)
+        )
+
+    @staticmethod
+    async def get_top(session: AsyncSession, limit: int = 10) -> List[Dict]:
+        query = (
+            select(TraderLeaderboard, User.name, User.email)
+            .join(User, User.id == TraderLeaderboard.user_id)
+            .order_by(TraderLeaderboard.return_percentage.desc(), TraderLeaderboard.user_id)
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return [
+            {
+                "user_id": entry.user_id,
+                "user_name": name,
+                "user_email": email,
+                "total_accounts": entry.total_accounts,
+                "total_positions": entry.total_positions,
+                "total_invested": round(entry.total_invested, 2),
+                "current_value": round(entry.current_value, 2),
+                "profit_loss": round(entry.profit_loss, 2),
+                "return_percentage": round(entry.return_percentage, 2),
+            }
+            for entry, name, email in result.all()
+        ]
@@ -0,0 +1,17 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Integer, Float, DateTime, ForeignKey, func
+from src.database import Base
+from datetime import datetime
+
+
+class TraderLeaderboard(Base):
+    __tablename__ = "trader_leaderboard"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    total_accounts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_positions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_invested: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    current_value: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    profit_loss: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    return_percentage: Mapped[float] = mapped_column(Float, default=0.0, nullable=False, index=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
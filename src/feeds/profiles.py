@@ -0,0 +1,11 @@
+from typing import Iterable
+
+from src.cache import TTLCache
+from src.config import settings
+
+profile_cache = TTLCache(maxsize=1024, ttl=settings.trader_profile_cache_ttl_seconds)
+
+
+def invalidate_profiles(user_ids: Iterable[int]):
+    for user_id in user_ids:
+        profile_cache.pop(user_id)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Header, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database import get_async_session
+from src.database import get_read_session
 from src.feeds.services import FeedService
+from src.feeds.stream import stream_activity, parse_trader_ids
+from src.stocks.stream import parse_symbols
+from src.coalescing import coalesce
 from src.feeds.schemas import (
     TopTradersListResponse,
     RecentTradesListResponse, 
@@ -11,10 +14,13 @@ from src.feeds.schemas import (
 
 router = APIRouter(prefix="/feed", tags=["Social Feed"])
 
+shared_top_traders = coalesce("top_traders", FeedService.get_top_traders)
+shared_trending_stocks = coalesce("trending_stocks", FeedService.get_trending_stocks)
+
 
 @router.get("/top-traders", response_model=TopTradersListResponse)
-async def get_top_traders(limit: int = Query(10, ge=1, le=50, description="Number of top traders to return"), session: AsyncSession = Depends(get_async_session)):
-    top_traders = await FeedService.get_top_traders(session, limit)
+async def get_top_traders(limit: int = Query(10, ge=1, le=50, description="Number of top traders to return")):
+    top_traders = await shared_top_traders(limit)
     return {
         "count": len(top_traders),
         "traders": top_traders
@@ -22,18 +28,24 @@ async def get_top_traders(limit: int = Query(10, ge=1, le=50, description="Numbe
 
 
 @router.get("/recent-trades", response_model=RecentTradesListResponse)
-async def get_recent_trades_from_top_traders(limit: int = Query(20, ge=1, le=100, description="Number of trades to return"),days: int = Query(7, ge=1, le=30, description="Number of days to look back"),session: AsyncSession = Depends(get_async_session)):
-    recent_trades = await FeedService.get_recent_trades_from_top_traders(session, limit, days)
+async def get_recent_trades_from_top_traders(limit: int = Query(20, ge=1, le=100, description="Number of trades to return"),days: int = Query(7, ge=1, le=30, description="Number of days to look back"),cursor: str | None = Query(None, description="Cursor from a previous page's next_cursor"),session: AsyncSession = Depends(get_read_session)):
+    recent_trades = await FeedService.get_recent_trades_from_top_traders(session, limit, days, cursor)
     return {
-        "count": len(recent_trades),
+        "count": len(recent_trades["trades"]),
         "period_days": days,
-        "trades": recent_trades
+        "trades": recent_trades["trades"],
+        "next_cursor": recent_trades["next_cursor"]
     }
 
 
+@router.get("/stream")
+async def stream_feed(request: Request, traders: str | None = Query(None, description="Comma-separated user IDs to follow"), symbols: str | None = Query(None, description="Comma-separated stock symbols to follow"), last_event_id: int | None = Header(None, alias="Last-Event-ID")):
+    return stream_activity(request, parse_trader_ids(traders), parse_symbols(symbols), last_event_id)
+
+
 @router.get("/trending-stocks", response_model=TrendingStocksListResponse)
-async def get_trending_stocks(days: int = Query(7, ge=1, le=30, description="Number of days to analyze"), session: AsyncSession = Depends(get_async_session)):
-    trending = await FeedService.get_trending_stocks(session, days)
+async def get_trending_stocks(days: int = Query(7, ge=1, le=30, description="Number of days to analyze")):
+    trending = await shared_trending_stocks(days)
     return {
         "count": len(trending),
         "period_days": days,
@@ -42,6 +54,6 @@ async def get_trending_stocks(days: int = Query(7, ge=1, le=30, description="Num
 
 
 @router.get("/trader/{user_id}", response_model=TraderProfileResponse)
-async def get_trader_profile(user_id: int, session: AsyncSession = Depends(get_async_session)):
+async def get_trader_profile(user_id: int, session: AsyncSession = Depends(get_read_session)):
     profile = await FeedService.get_trader_profile(user_id, session)
     return profile
\ No newline at end of file
@@ -41,6 +41,7 @@ class TrendingStockResponse(CustomBase):
     traders_buying: int = Field(..., description="Number of unique traders buying")
     total_invested: float = Field(..., description="Total amount invested by all traders")
     trend_score: int = Field(..., description="Trending score (purchase_count × traders_buying)")
+    decayed_score: float = Field(..., description="Trend score with each purchase weighted down by its age")
 
 
 class TraderProfileResponse(CustomBase):
@@ -65,6 +66,7 @@ class RecentTradesListResponse(CustomBase):
     count: int
     period_days: int
     trades: List[RecentTradeResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
 
 
 class TrendingStocksListResponse(CustomBase):
@@ -1,258 +1,187 @@
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, and_, or_
 from fastapi import HTTPException
 from src.users.models import User
 from src.accounts.models import Account
-from src.positions.models import Position
 from src.stocks.models import Stock
 from src.trades.models import Trade
 from src.positions.services import PositionService
-from src.trades.services import TradeService
-from typing import List, Dict
+from src.feeds.leaderboard import LeaderboardService
+from src.feeds.trending import trending_tracker
+from src.feeds.profiles import profile_cache
+from src.database import read_session
+from src.cache import TTLCache
+from src.config import settings
+from src.pagination import encode_cursor, decode_cursor
+from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from collections import Counter
+
+TOP_TRADERS_LIMIT = 10
+
+feed_cache = TTLCache(maxsize=512, ttl=settings.feed_cache_ttl_seconds)
 
 
 class FeedService:
     @staticmethod
     async def get_top_traders(session: AsyncSession, limit: int = 10) -> List[Dict]:
-        users_query = select(User)
-        users_result = await session.scalars(users_query)
-        users = list(users_result.all())
-        
-        traders_performance = []
-        
-        for user in users:
-            accounts_query = select(Account).where(Account.user_id == user.id)
-            accounts_result = await session.scalars(accounts_query)
-            accounts = list(accounts_result.all())
-            
-            if not accounts:
-                continue
-            
-            total_invested = 0.0
-            total_current_value = 0.0
-            total_profit_loss = 0.0
-            num_positions = 0
-            
-            for account in accounts:
-                try:
-                    portfolio = await PositionService.get_portfolio_summary(account.id, session)
-                    
-                    if portfolio.total_positions > 0:
-                        total_invested += portfolio.total_invested
-                        total_current_value += portfolio.current_portfolio_value
-                        total_profit_loss += portfolio.total_unrealized_profit_loss
-                        num_positions += portfolio.total_positions
-                except Exception:
-                    continue
-            
-            if num_positions > 0 and total_invested > 0:
-                return_percentage = (total_profit_loss / total_invested * 100)
-                
-                traders_performance.append({
-                    "user_id": user.id,
-                    "user_name": user.name,
-                    "user_email": user.email,
-                    "total_accounts": len(accounts),
-                    "total_positions": num_positions,
-                    "total_invested": round(total_invested, 2),
-                    "current_value": round(total_current_value, 2),
-                    "profit_loss": round(total_profit_loss, 2),
-                    "return_percentage": round(return_percentage, 2)
-                })
-        
-        traders_performance.sort(key=lambda x: x["return_percentage"], reverse=True)
-        
-        return traders_performance[:limit]
+        return await LeaderboardService.get_top(session, limit)
     
     @staticmethod
-    async def get_recent_trades_from_top_traders(session: AsyncSession,  limit: int = 20, days: int = 7) -> List[Dict]:
-        top_traders = await FeedService.get_top_traders(session, limit=10)
-        
-        if not top_traders:
-            return []
-        
-        top_user_ids = [trader["user_id"] for trader in top_traders]
+    async def get_recent_trades_from_top_traders(session: AsyncSession, limit: int = 20, days: int = 7, cursor: Optional[str] = None) -> Dict:
+        cache_key = ("recent_trades", limit, days, cursor)
+        cached = feed_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
+        top_traders = LeaderboardService.top_query(TOP_TRADERS_LIMIT).subquery()
         cutoff_date = datetime.now() - timedelta(days=days)
         
-        accounts_query = select(Account).where(Account.user_id.in_(top_user_ids))
-        accounts_result = await session.scalars(accounts_query)
-        accounts = list(accounts_result.all())
-        account_ids = [acc.id for acc in accounts]
-        
-        if not account_ids:
-            return []
-        
-        trades_query = select(Trade).where(
-            Trade.account_id.in_(account_ids),
-            Trade.type == "BUY_STOCK",
-            Trade.timestamp >= cutoff_date
-        ).order_by(Trade.timestamp.desc()).limit(limit)
+        trades_query = (
+            select(
+                Trade.id.label("trade_id"),
+                User.name.label("trader_name"),
+                User.id.label("trader_id"),
+                top_traders.c.return_percentage.label("trader_return"),
+                Stock.id.label("stock_id"),
+                Stock.name.label("stock_name"),
+                Stock.symbol.label("stock_symbol"),
+                Stock.average_price.label("stock_price"),
+                Trade.quantity,
+                Trade.price,
+                Trade.amount.label("total_amount"),
+                Trade.timestamp,
+                Trade.description,
+            )
+            .join(Account, Account.id == Trade.account_id)
+            .join(top_traders, top_traders.c.user_id == Account.user_id)
+            .join(User, User.id == Account.user_id)
+            .join(Stock, Stock.id == Trade.stock_id)
+            .where(Trade.type == "BUY_STOCK", Trade.timestamp >= cutoff_date)
+            .order_by(Trade.timestamp.desc(), Trade.id.desc())
+        )
         
-        trades_result = await session.scalars(trades_query)
-        trades = list(trades_result.all())
+        if cursor:
+            last_timestamp, last_id = decode_cursor(cursor, 2)
+            try:
+                last_timestamp = datetime.fromisoformat(last_timestamp)
+                last_id = int(last_id)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            trades_query = trades_query.where(
+                or_(Trade.timestamp < last_timestamp, and_(Trade.timestamp == last_timestamp, Trade.id < last_id))
+            )
+        
+        trades_result = await session.execute(trades_query.limit(limit + 1))
+        rows = trades_result.all()
+        page = rows[:limit]
         
         recent_trades = []
-        
-        for trade in trades:
-            account = next((acc for acc in accounts if acc.id == trade.account_id), None)
-            if not account:
-                continue
-            
-            trader = next((t for t in top_traders if t["user_id"] == account.user_id), None)
-            if not trader:
-                continue
-            
-            stock_query = select(Stock).where(Stock.id == trade.stock_id)
-            stock_result = await session.scalars(stock_query)
-            stock = stock_result.first()
-            
-            if not stock:
-                continue
-            
-            recent_trades.append({
-                "trade_id": trade.id,
-                "trader_name": trader["user_name"],
-                "trader_id": trader["user_id"],
-                "trader_return": trader["return_percentage"],
-                "stock_id": stock.id,
-                "stock_name": stock.name,
-                "stock_symbol": stock.symbol,
-                "stock_price": stock.average_price,
-                "quantity": trade.quantity,
-                "price": trade.price,
-                "total_amount": trade.amount,
-                "timestamp": trade.timestamp,
-                "description": trade.description
-            })
-        
-        return recent_trades
+        for row in page:
+            trade = row._asdict()
+            trade["trader_return"] = round(trade["trader_return"], 2)
+            recent_trades.append(trade)
+        
+        response = {
+            "trades": recent_trades,
+            "next_cursor": encode_cursor(page[-1].timestamp.isoformat(), page[-1].trade_id) if len(rows) > limit else None,
+        }
+        feed_cache.set(cache_key, response)
+        return response
     
     @staticmethod
     async def get_trending_stocks(session: AsyncSession, days: int = 7) -> List[Dict]:
-        top_traders = await FeedService.get_top_traders(session, limit=10)
-        
-        if not top_traders:
-            return []
-        
-        top_user_ids = [trader["user_id"] for trader in top_traders]
-        
-        accounts_query = select(Account).where(Account.user_id.in_(top_user_ids))
-        accounts_result = await session.scalars(accounts_query)
-        accounts = list(accounts_result.all())
-        account_ids = [acc.id for acc in accounts]
-        
-        if not account_ids:
+        top_user_ids = await session.scalars(select(LeaderboardService.top_query(TOP_TRADERS_LIMIT).subquery().c.user_id))
+        trending_stocks = await trending_tracker.trending(session, list(top_user_ids.all()), days)
+        if not trending_stocks:
             return []
         
-        cutoff_date = datetime.now() - timedelta(days=days)
-        trades_query = select(Trade).where(
-            Trade.account_id.in_(account_ids),
-            Trade.type == "BUY_STOCK",
-            Trade.timestamp >= cutoff_date
+        stocks_query = select(Stock.id, Stock.name, Stock.symbol, Stock.average_price).where(Stock.id.in_([stock["stock_id"] for stock in trending_stocks]))
+        stocks_result = await session.execute(stocks_query)
+        stocks = {row.id: row for row in stocks_result.all()}
+        
+        return [
+            {
+                **trending,
+                "stock_name": stocks[trending["stock_id"]].name,
+                "stock_symbol": stocks[trending["stock_id"]].symbol,
+                "current_price": stocks[trending["stock_id"]].average_price,
+            }
+            for trending in trending_stocks
+            if trending["stock_id"] in stocks
+        ]
+    
+    @staticmethod
+    async def _fetch_user(user_id: int) -> Optional[User]:
+        async with read_session() as session:
+            return await session.get(User, user_id)
+    
+    @staticmethod
+    async def _count_accounts(user_id: int) -> int:
+        async with read_session() as session:
+            return await session.scalar(select(func.count(Account.id)).where(Account.user_id == user_id))
+    
+    @staticmethod
+    async def _count_recent_trades(user_id: int) -> int:
+        recent_trades = (
+            select(Trade.id)
+            .join(Account, Account.id == Trade.account_id)
+            .where(Account.user_id == user_id, Trade.type.in_(["BUY_STOCK", "SELL_STOCK"]))
+            .limit(10)
+            .subquery()
         )
-        
-        trades_result = await session.scalars(trades_query)
-        trades = list(trades_result.all())
-        stock_counter = Counter()
-        stock_total_invested = {}
-        
-        for trade in trades:
-            stock_counter[trade.stock_id] += 1
-            stock_total_invested[trade.stock_id] = stock_total_invested.get(trade.stock_id, 0) + trade.amount
-        
-        trending_stocks = []
-        
-        for stock_id, purchase_count in stock_counter.most_common(10):
-            stock_query = select(Stock).where(Stock.id == stock_id)
-            stock_result = await session.scalars(stock_query)
-            stock = stock_result.first()
-            
-            if not stock:
-                continue
-            
-            traders_buying = set()
-            for trade in trades:
-                if trade.stock_id == stock_id:
-                    account = next((acc for acc in accounts if acc.id == trade.account_id), None)
-                    if account:
-                        traders_buying.add(account.user_id)
-            
-            trending_stocks.append({
-                "stock_id": stock.id,
-                "stock_name": stock.name,
-                "stock_symbol": stock.symbol,
-                "current_price": stock.average_price,
-                "purchase_count": purchase_count,
-                "traders_buying": len(traders_buying),
-                "total_invested": round(stock_total_invested[stock_id], 2),
-                "trend_score": purchase_count * len(traders_buying)
-            })
-        
-        trending_stocks.sort(key=lambda x: x["trend_score"], reverse=True)
-        
-        return trending_stocks
+        async with read_session() as session:
+            return await session.scalar(select(func.count()).select_from(recent_trades))
     
     @staticmethod
     async def get_trader_profile(user_id: int, session: AsyncSession) -> Dict:
-        user_query = select(User).where(User.id == user_id)
-        user_result = await session.scalars(user_query)
-        user = user_result.first()
+        cached = profile_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
+        positions_query = PositionService.valued_positions_query(Account.user_id == user_id)
+        user, total_accounts, recent_trades_count, positions_result = await asyncio.gather(
+            FeedService._fetch_user(user_id),
+            FeedService._count_accounts(user_id),
+            FeedService._count_recent_trades(user_id),
+            session.execute(positions_query),
+        )
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        accounts_query = select(Account).where(Account.user_id == user_id)
-        accounts_result = await session.scalars(accounts_query)
-        accounts = list(accounts_result.all())
-        
         total_invested = 0.0
         total_current_value = 0.0
-        total_profit_loss = 0.0
-        all_positions = []
-        
-        for account in accounts:
-            try:
-                portfolio = await PositionService.get_portfolio_summary(account.id, session)
-                
-                if portfolio.total_positions > 0:
-                    total_invested += portfolio.total_invested
-                    total_current_value += portfolio.current_portfolio_value
-                    total_profit_loss += portfolio.total_unrealized_profit_loss
-                    
-                    for position in portfolio.positions:
-                        all_positions.append({
-                            "stock_id": position.stock_id,
-                            "stock_name": position.stock_name,
-                            "stock_ticker": position.stock_ticker,
-                            "quantity": position.quantity,
-                            "profit_loss_percentage": position.unrealized_profit_loss_percentage
-                        })
-            except Exception:
-                continue
-        
-        account_ids = [acc.id for acc in accounts]
-        trades_query = select(Trade).where(
-            Trade.account_id.in_(account_ids),
-            Trade.type.in_(["BUY_STOCK", "SELL_STOCK"])
-        ).order_by(Trade.timestamp.desc()).limit(10)
-        
-        trades_result = await session.scalars(trades_query)
-        recent_trades = list(trades_result.all())
-        
+        valued_positions = []
+        
+        for position in positions_result.all():
+            invested = position.quantity * position.average_purchase_price
+            current_value = position.quantity * position.current_market_price
+            total_invested += invested
+            total_current_value += current_value
+            valued_positions.append((position.account_id, -current_value, {
+                "stock_id": position.stock_id,
+                "stock_name": position.stock_name,
+                "stock_ticker": position.stock_ticker,
+                "quantity": position.quantity,
+                "profit_loss_percentage": ((current_value - invested) / invested * 100) if invested > 0 else 0
+            }))
+        
+        valued_positions.sort(key=lambda item: item[:2])
+        total_profit_loss = total_current_value - total_invested
         return_percentage = (total_profit_loss / total_invested * 100) if total_invested > 0 else 0
         
-        return {
+        profile = {
             "user_id": user.id,
             "user_name": user.name,
             "member_since": user.created_at,
-            "total_accounts": len(accounts),
+            "total_accounts": total_accounts,
             "total_invested": round(total_invested, 2),
             "current_value": round(total_current_value, 2),
             "profit_loss": round(total_profit_loss, 2),
             "return_percentage": round(return_percentage, 2),
-            "positions": all_positions,
-            "recent_trades_count": len(recent_trades)
-        }
\ No newline at end of file
+            "positions": [position for _, _, position in valued_positions],
+            "recent_trades_count": recent_trades_count
+        }
+        profile_cache.set(user_id, profile)
+        return profile
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from src.config import settings
+from src.stocks.stream import stock_key
+
+KEEPALIVE_SECONDS = 15.0
+RETRY_MILLISECONDS = 3000
+
+
+def trade_event(trade, trader_id: int, trader_name: str, stock) -> dict:
+    return {
+        "trade_id": trade.id,
+        "trader_id": trader_id,
+        "trader_name": trader_name,
+        "stock_id": stock.id,
+        "stock_name": stock.name,
+        "stock_symbol": stock_key(stock.id, stock.symbol),
+        "type": trade.type,
+        "quantity": trade.quantity,
+        "price": trade.price,
+        "total_amount": trade.amount,
+        "timestamp": trade.timestamp.isoformat() if trade.timestamp else None,
+    }
+
+
+class ActivityHub:
+    def __init__(self, buffer_size: int = 1000):
+        self._events: deque[tuple[int, dict]] = deque(maxlen=buffer_size)
+        # Ids start from the boot time in milliseconds so a Last-Event-ID from
+        # before a restart never hides newer events.
+        self._last_id = int(time.time() * 1000)
+        self._signal = asyncio.Event()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    @property
+    def signal(self) -> asyncio.Event:
+        return self._signal
+
+    def publish(self, event: dict) -> int:
+        self._last_id += 1
+        self._events.append((self._last_id, event))
+        signal, self._signal = self._signal, asyncio.Event()
+        signal.set()
+        return self._last_id
+
+    def since(self, last_id: int) -> list[tuple[int, dict]]:
+        if not self._events or self._events[-1][0] <= last_id:
+            return []
+        return [(event_id, event) for event_id, event in self._events if event_id > last_id]
+
+
+activity_hub = ActivityHub(buffer_size=settings.feed_stream_buffer_size)
+
+
+def parse_trader_ids(raw: Optional[str]) -> set[int]:
+    try:
+        return {int(value) for value in (raw or "").split(",") if value.strip()}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="traders must be a comma-separated list of user IDs")
+
+
+def _matches(event: dict, traders: set[int], symbols: set[str]) -> bool:
+    return (not traders or event["trader_id"] in traders) and (not symbols or event["stock_symbol"] in symbols)
+
+
+def _format(event_id: int, event: dict) -> str:
+    return f"id: {event_id}\nevent: trade\ndata: {json.dumps(event)}\n\n"
+
+
+def stream_activity(request: Request, traders: Iterable[int], symbols: Iterable[str], last_event_id: Optional[int] = None) -> StreamingResponse:
+    traders, symbols = set(traders), set(symbols)
+
+    async def events():
+        last_id = activity_hub.last_id if last_event_id is None else last_event_id
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while not await request.is_disconnected():
+            signal = activity_hub.signal
+            for event_id, event in activity_hub.since(last_id):
+                last_id = event_id
+                if _matches(event, traders, symbols):
+                    yield _format(event_id, event)
+            try:
+                await asyncio.wait_for(signal.wait(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,160 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.accounts.models import Account
+from src.config import settings
+from src.trades.models import Trade
+
+RETENTION_DAYS = 30
+# Users that dropped out of the top set stay cached in case they return, up to this many.
+MAX_TRACKED_USERS = 200
+# Trades carry their transaction's start time, so an hour is only treated as
+# closed once transactions that began inside it have had time to commit.
+SETTLE_DELAY = timedelta(minutes=1)
+
+
+def _hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class TrendingTracker:
+    def __init__(self, half_life_hours: float = 24.0):
+        self.half_life_hours = half_life_hours
+        # hour -> user -> stock -> (purchases, invested). Buckets are kept per user
+        # so a change in the top-trader set only loads the users new to it.
+        self._buckets: dict[datetime, dict[int, dict[int, tuple[int, float]]]] = {}
+        # Users whose closed hours are cached, least recently requested first.
+        self._users: OrderedDict[int, None] = OrderedDict()
+        self._loaded_from: Optional[datetime] = None
+        self._loaded_until: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    async def _load(session: AsyncSession, user_ids: tuple[int, ...], start: datetime, end: Optional[datetime] = None) -> dict:
+        # Truncate in UTC so bucket boundaries do not follow the session TimeZone.
+        hour = func.date_trunc("hour", func.timezone("UTC", Trade.timestamp)).label("hour")
+        query = (
+            select(
+                hour,
+                Account.user_id,
+                Trade.stock_id,
+                func.count(Trade.id).label("purchases"),
+                func.coalesce(func.sum(Trade.amount), 0).label("invested"),
+            )
+            .join(Account, Account.id == Trade.account_id)
+            .where(Account.user_id.in_(user_ids), Trade.type == "BUY_STOCK", Trade.timestamp >= start)
+            .group_by(hour, Account.user_id, Trade.stock_id)
+        )
+        if end is not None:
+            query = query.where(Trade.timestamp < end)
+        result = await session.execute(query)
+        buckets = {}
+        for row in result.all():
+            hour_start = row.hour.replace(tzinfo=timezone.utc)
+            buckets.setdefault(hour_start, {}).setdefault(row.user_id, {})[row.stock_id] = (row.purchases, float(row.invested))
+        return buckets
+
+    @staticmethod
+    def _merge_into(target: dict, buckets: dict):
+        # Merge per (hour, user, stock) so a partial load never drops entries
+        # that an earlier load already filled in.
+        for hour, users in buckets.items():
+            hour_users = target.setdefault(hour, {})
+            for user_id, stocks in users.items():
+                hour_users.setdefault(user_id, {}).update(stocks)
+
+    def _merge(self, buckets: dict):
+        self._merge_into(self._buckets, buckets)
+
+    async def invalidate(self, user_ids: Iterable[int] = (), stock_ids: Iterable[int] = ()):
+        # Closed hours are cached for good, so deleted trades must be dropped here.
+        # Forgotten users are reloaded in full the next time they are requested.
+        user_ids, stock_ids = set(user_ids), set(stock_ids)
+        async with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+            for users in self._buckets.values():
+                for user_id in user_ids:
+                    users.pop(user_id, None)
+                for stocks in users.values():
+                    for stock_id in stock_ids:
+                        stocks.pop(stock_id, None)
+
+    async def _closed_buckets(self, session: AsyncSession, user_ids: tuple[int, ...], window_start: datetime, settled_hour: datetime) -> dict:
+        async with self._lock:
+            if self._loaded_until is None:
+                self._loaded_from = self._loaded_until = settled_hour
+            new_users = tuple(user_id for user_id in user_ids if user_id not in self._users)
+            if new_users and self._loaded_from < self._loaded_until:
+                self._merge(await self._load(session, new_users, self._loaded_from, self._loaded_until))
+            for user_id in user_ids:
+                self._users[user_id] = None
+                self._users.move_to_end(user_id)
+            tracked = tuple(self._users)
+            if window_start < self._loaded_from:
+                self._merge(await self._load(session, tracked, window_start, self._loaded_from))
+                self._loaded_from = window_start
+            if self._loaded_until < settled_hour:
+                self._merge(await self._load(session, tracked, self._loaded_until, settled_hour))
+                self._loaded_until = settled_hour
+            while len(self._users) > MAX_TRACKED_USERS:
+                evicted, _ = self._users.popitem(last=False)
+                for users in self._buckets.values():
+                    users.pop(evicted, None)
+            retention_start = settled_hour - timedelta(days=RETENTION_DAYS)
+            for hour in [hour for hour in self._buckets if hour < retention_start]:
+                del self._buckets[hour]
+            self._loaded_from = max(self._loaded_from, retention_start)
+            return {
+                hour: {user_id: dict(users[user_id]) for user_id in user_ids if user_id in users}
+                for hour, users in self._buckets.items()
+                if hour >= window_start
+            }
+
+    async def trending(self, session: AsyncSession, user_ids: list[int], days: int, limit: int = 10) -> list[dict]:
+        user_ids = tuple(sorted(user_ids))
+        if not user_ids:
+            return []
+        now = datetime.now(timezone.utc)
+        settled_hour = _hour(now - SETTLE_DELAY)
+        window_start = _hour(now - timedelta(days=days))
+        buckets = await self._closed_buckets(session, user_ids, window_start, settled_hour)
+        self._merge_into(buckets, await self._load(session, user_ids, settled_hour))
+
+        totals: dict[int, dict] = {}
+        for hour, users in buckets.items():
+            age_hours = max((now - hour).total_seconds() / 3600 - 0.5, 0.0)
+            weight = 0.5 ** (age_hours / self.half_life_hours)
+            for user_id, stocks in users.items():
+                for stock_id, (purchases, invested) in stocks.items():
+                    total = totals.setdefault(stock_id, {"purchase_count": 0, "total_invested": 0.0, "buyers": set(), "decayed_purchases": 0.0})
+                    total["purchase_count"] += purchases
+                    total["total_invested"] += invested
+                    total["buyers"].add(user_id)
+                    total["decayed_purchases"] += purchases * weight
+
+        ranked = []
+        for stock_id, total in totals.items():
+            traders_buying = len(total["buyers"])
+            ranked.append({
+                "stock_id": stock_id,
+                "purchase_count": total["purchase_count"],
+                "traders_buying": traders_buying,
+                "total_invested": round(total["total_invested"], 2),
+                "trend_score": total["purchase_count"] * traders_buying,
+                "decayed_score": round(total["decayed_purchases"] * traders_buying, 4),
+            })
+        ranked.sort(key=lambda stock: (stock["decayed_score"], stock["trend_score"]), reverse=True)
+        return ranked[:limit]
+
+
+trending_tracker = TrendingTracker(half_life_hours=settings.trending_half_life_hours)
+
+
+async def invalidate_trending(user_ids: Iterable[int] = (), stock_ids: Iterable[int] = ()):
+    await trending_tracker.invalidate(user_ids, stock_ids)
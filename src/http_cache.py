@@ -0,0 +1,53 @@
+import hashlib
+import json
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_async_session, get_read_session
+from src.stocks.services import StockService
+from src.trades.services import TradeService
+
+# Clients may keep a copy but must revalidate it; a matching ETag costs one
+# version query and an empty 304.
+SHARED_CACHE_CONTROL = "public, no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256(json.dumps(parts, default=str, separators=(",", ":")).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored.
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def conditional_get(request: Request, response: Response, etag: str, cache_control: str):
+    # Versions are read before the body, so a write in between can only pair a
+    # newer body with an older ETag, which costs the client one extra download.
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+async def stocks_etag(request: Request, response: Response, session: AsyncSession = Depends(get_read_session)):
+    version = await StockService.catalog_version(session)
+    conditional_get(request, response, make_etag("stocks", *version), SHARED_CACHE_CONTROL)
+
+
+async def account_etag(account_id: int, request: Request, response: Response, session: AsyncSession = Depends(get_async_session)):
+    # Account reads stay on the primary so a client sees its own trades straight
+    # away and never caches a replica's older state behind a 304.
+    ledger = await TradeService.ledger_version(account_id, session)
+    if ledger is None:
+        return
+    # Portfolio values move with prices as well as with the account's own trades.
+    stocks = await StockService.catalog_version(session)
+    conditional_get(request, response, make_etag("account", account_id, *ledger, *stocks), PRIVATE_CACHE_CONTROL)
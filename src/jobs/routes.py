@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database import get_async_session
+from src.jobs.schemas import DeletionJobCreate, DeletionJobResponse
+from src.jobs.services import DeletionJobService
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.post("/deletions", response_model=DeletionJobResponse, status_code=202)
+async def start_deletion(payload: DeletionJobCreate, session: AsyncSession = Depends(get_async_session)):
+    job = await DeletionJobService.start(payload.entity, payload.id, session)
+    return job
+
+
+@router.get("/deletions/{job_id}", response_model=DeletionJobResponse)
+async def get_deletion(job_id: str):
+    job = DeletionJobService.get(job_id)
+    return job
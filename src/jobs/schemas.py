@@ -0,0 +1,25 @@
+from src.schemas import CustomBase
+from datetime import datetime
+from pydantic import PositiveInt, Field
+from typing import Optional, Literal
+
+
+class DeletionJobCreate(CustomBase):
+    entity: Literal["user", "account", "stock"]
+    id: PositiveInt
+
+
+class DeletionJobResponse(CustomBase):
+    id: str
+    entity: str
+    entity_id: PositiveInt
+    status: Literal["pending", "running", "completed", "failed", "cancelled"]
+    total_trades: int = Field(..., description="Trades to delete, counted when the job started")
+    deleted_trades: int
+    progress: float = Field(..., description="Percentage of trades deleted so far")
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.accounts.models import Account
+from src.config import settings
+from src.database import async_session_maker
+from src.feeds.leaderboard import LeaderboardService
+from src.feeds.profiles import invalidate_profiles
+from src.feeds.trending import invalidate_trending
+from src.stocks.history import invalidate_rollups
+from src.stocks.models import Stock
+from src.trades.models import Trade
+from src.users.models import User
+
+logger = logging.getLogger(__name__)
+
+ENTITY_MODELS = {"user": User, "account": Account, "stock": Stock}
+MAX_RETAINED_JOBS = 200
+
+
+@dataclass
+class DeletionJob:
+    id: str
+    entity: str
+    entity_id: int
+    status: str = "pending"
+    total_trades: int = 0
+    deleted_trades: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 100.0
+        if not self.total_trades:
+            return 0.0
+        return round(min(self.deleted_trades / self.total_trades, 1.0) * 100, 2)
+
+
+class DeletionJobService:
+    _jobs: "OrderedDict[str, DeletionJob]" = OrderedDict()
+    _tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _trades_criterion(entity: str, entity_id: int):
+        if entity == "user":
+            return Trade.account_id.in_(select(Account.id).where(Account.user_id == entity_id))
+        if entity == "account":
+            return Trade.account_id == entity_id
+        return Trade.stock_id == entity_id
+
+    @staticmethod
+    async def _affected_users(entity: str, entity_id: int, session: AsyncSession) -> list[int]:
+        if entity == "user":
+            return [entity_id]
+        if entity == "account":
+            return list((await session.scalars(select(Account.user_id).where(Account.id == entity_id))).all())
+        return await LeaderboardService.holder_user_ids(entity_id, session)
+
+    @staticmethod
+    async def start(entity: str, entity_id: int, session: AsyncSession) -> DeletionJob:
+        model = ENTITY_MODELS[entity]
+        if not await session.scalar(select(model.id).where(model.id == entity_id)):
+            raise HTTPException(status_code=404, detail=f"{entity.capitalize()} not found")
+        job = DeletionJob(id=uuid.uuid4().hex, entity=entity, entity_id=entity_id)
+        DeletionJobService._jobs[job.id] = job
+        finished = [job_id for job_id, old in DeletionJobService._jobs.items() if old.finished_at]
+        for job_id in finished[:max(len(DeletionJobService._jobs) - MAX_RETAINED_JOBS, 0)]:
+            del DeletionJobService._jobs[job_id]
+        task = asyncio.create_task(DeletionJobService._run(job))
+        DeletionJobService._tasks.add(task)
+        task.add_done_callback(DeletionJobService._tasks.discard)
+        return job
+
+    @staticmethod
+    def get(job_id: str) -> DeletionJob:
+        job = DeletionJobService._jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+
+    @staticmethod
+    async def _run(job: DeletionJob):
+        job.status = "running"
+        criterion = DeletionJobService._trades_criterion(job.entity, job.entity_id)
+        chunk_size = settings.deletion_chunk_size
+        try:
+            async with async_session_maker() as session:
+                user_ids = await DeletionJobService._affected_users(job.entity, job.entity_id, session)
+                job.total_trades = await session.scalar(select(func.count(Trade.id)).where(criterion))
+                # Trades are the only unbounded children, so they go first in short
+                # transactions; the parent delete then cascades over what is left.
+                while True:
+                    chunk = select(Trade.id).where(criterion).limit(chunk_size).scalar_subquery()
+                    result = await session.execute(delete(Trade).where(Trade.id.in_(chunk)))
+                    await session.commit()
+                    job.deleted_trades += result.rowcount
+                    if result.rowcount < chunk_size:
+                        break
+                model = ENTITY_MODELS[job.entity]
+                await session.execute(delete(model).where(model.id == job.entity_id))
+                await LeaderboardService.refresh_users(user_ids, session)
+                await session.commit()
+            invalidate_profiles(user_ids)
+            await invalidate_trending(user_ids, [job.entity_id] if job.entity == "stock" else ())
+            if job.entity == "stock":
+                invalidate_rollups([job.entity_id])
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as exc:
+            logger.exception("Deletion job %s failed", job.id)
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
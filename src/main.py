@@ -1,7 +1,12 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.config import settings
+from src.compression import CompressionMiddleware
+from src.metrics.instrumentation import MetricsMiddleware
+from src.metrics.query_guard import QueryGuardMiddleware
 
 from src.users.routes import router as user_router
 from src.accounts.routes import router as account_router
@@ -9,8 +14,28 @@ from src.stocks.routes import router as stock_router
 from src.trades.routes import router as trades_router
 from src.positions.routes import router as positions_router
 from src.feeds.routes import router as feeds_router
+from src.metrics.routes import router as metrics_router
+from src.jobs.routes import router as jobs_router
+from src.stocks.simulator import market_simulator
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.market_sim_enabled:
+        market_simulator.start()
+    yield
+    await market_simulator.stop()
+
+
+app = FastAPI(title=settings.app_name, description=settings.description, version="1.0.0", lifespan=lifespan)
 
-app = FastAPI(title=settings.app_name, description=settings.description, version="1.0.0")
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+if settings.query_guard_mode != "off":
+    app.add_middleware(QueryGuardMiddleware)
+# Wraps compression and the query guard so its timings cover the full response.
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "X-Query-Count"],
 )
 
 app.include_router(user_router)
@@ -26,6 +52,8 @@ app.include_router(stock_router)
 app.include_router(trades_router)
 app.include_router(positions_router)
 app.include_router(feeds_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -0,0 +1,204 @@
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Everything here is updated from the event loop thread only (SQLAlchemy's
+# async engines run cursor events there too), so plain integer updates are
+# safe without locks.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+STATEMENT_KINDS = {"SELECT": "select", "INSERT": "insert", "UPDATE": "update", "DELETE": "delete"}
+UNMATCHED_ROUTE = "unmatched"
+# Long-lived connections are counted apart from requests; their lifetimes would
+# swamp the latency histograms and pin the in-flight gauge.
+STREAM_KINDS = ("sse", "websocket")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield repr(float(bound)), running
+        yield "+Inf", self.count
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Statement counts by SQL text, only kept while the query guard is on.
+        self.shapes: Optional[Counter] = None
+
+
+class Registry:
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.queries_per_request: dict[tuple[str, str], Histogram] = {}
+        self.query_latency: dict[str, Histogram] = {kind: Histogram(QUERY_BUCKETS) for kind in (*STATEMENT_KINDS.values(), "other")}
+        self.streams_open: dict[str, int] = {kind: 0 for kind in STREAM_KINDS}
+        self.streams: dict[tuple[str, str], int] = {}
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, queries: QueryStats):
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.queries_per_request[key] = Histogram(QUERY_COUNT_BUCKETS)
+        latency.observe(seconds)
+        self.queries_per_request[key].observe(queries.count)
+        status_key = (method, route, status)
+        self.requests[status_key] = self.requests.get(status_key, 0) + 1
+
+    def record_stream(self, kind: str, route: str):
+        key = (kind, route)
+        self.streams[key] = self.streams.get(key, 0) + 1
+
+    def render(self, flights: Optional[dict] = None) -> str:
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Completed requests by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+        _histograms(lines, "http_request_duration_seconds", "Request latency by route.", {(("method", method), ("route", route)): histogram for (method, route), histogram in self.latency.items()})
+        _histograms(lines, "http_request_db_queries", "SQL statements executed per request.", {(("method", method), ("route", route)): histogram for (method, route), histogram in self.queries_per_request.items()})
+        lines += ["# HELP streams_open Streaming connections (SSE and WebSocket) currently open.", "# TYPE streams_open gauge"]
+        for kind, count in self.streams_open.items():
+            lines.append(f"streams_open{_labels(kind=kind)} {count}")
+        lines += ["# HELP streams_total Closed streaming connections by route.", "# TYPE streams_total counter"]
+        for (kind, route), count in sorted(self.streams.items()):
+            lines.append(f"streams_total{_labels(kind=kind, route=route)} {count}")
+        _histograms(lines, "db_query_duration_seconds", "SQL statement latency by statement kind.", {(("kind", kind),): histogram for kind, histogram in self.query_latency.items()})
+        if flights:
+            for field, kind, help_text in (
+                ("executed", "counter", "Shared calls that ran the underlying query."),
+                ("coalesced", "counter", "Calls that joined a shared call already in flight."),
+                ("cache_hits", "counter", "Calls answered from the short result cache."),
+                ("in_flight", "gauge", "Shared calls currently running."),
+            ):
+                name = f"coalescing_{field}_total" if kind == "counter" else f"coalescing_{field}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for flight_name, flight in sorted(flights.items()):
+                    lines.append(f"{name}{_labels(flight=flight_name)} {flight.stats()[field]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histograms(lines: list[str], name: str, help_text: str, series: dict):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in sorted(series.items()):
+        labels = dict(labels)
+        for bound, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.total}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+registry = Registry()
+current_queries: ContextVar[Optional[QueryStats]] = ContextVar("current_queries", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    registry.query_latency[STATEMENT_KINDS.get(statement[:6].upper(), "other")].observe(elapsed)
+    stats = current_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        if stats.shapes is not None:
+            stats.shapes[statement] += 1
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE) if route is not None else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "websocket":
+            registry.streams_open["websocket"] += 1
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                registry.streams_open["websocket"] -= 1
+                registry.record_stream("websocket", route_template(scope))
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        streaming = False
+        stats = QueryStats()
+        token = current_queries.set(stats)
+
+        async def send_with_status(message: Message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # An event stream stops being a request once its headers go out.
+                if dict(message.get("headers", ())).get(b"content-type", b"").startswith(b"text/event-stream"):
+                    streaming = True
+                    registry.in_flight -= 1
+                    registry.streams_open["sse"] += 1
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_queries.reset(token)
+            # The route template, not the raw path, keeps label cardinality bounded.
+            route = route_template(scope)
+            if streaming:
+                registry.streams_open["sse"] -= 1
+                registry.record_stream("sse", route)
+            else:
+                registry.in_flight -= 1
+                registry.record_request(scope["method"], route, status, time.perf_counter() - started, stats)
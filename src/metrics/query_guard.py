@@ -0,0 +1,84 @@
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.metrics.instrumentation import QueryStats, current_queries, route_template
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _shorten(statement: str, width: int = 160) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= width else statement[: width - 3] + "..."
+
+
+def find_problems(stats: QueryStats, budget: Optional[int], threshold: int) -> list[str]:
+    problems = []
+    if budget is not None and stats.count > budget:
+        problems.append(f"{stats.count} queries over a budget of {budget}")
+    # Bound parameters keep the SQL text identical across loop iterations, so the
+    # same text executed many times in one request is the signature of an N+1.
+    for statement, count in (stats.shapes or Counter()).most_common():
+        if count < threshold:
+            break
+        problems.append(f"possible N+1, {count}x: {_shorten(statement)}")
+    return problems
+
+
+@contextmanager
+def assert_query_budget(budget: Optional[int] = None, threshold: Optional[int] = None) -> Iterator[QueryStats]:
+    # For service-level tests awaiting code in the current task; requests through
+    # TestClient run elsewhere and are checked by QUERY_GUARD_MODE=raise instead.
+    stats = QueryStats()
+    stats.shapes = Counter()
+    token = current_queries.set(stats)
+    try:
+        yield stats
+    finally:
+        current_queries.reset(token)
+    problems = find_problems(stats, budget, threshold or settings.n_plus_one_threshold)
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems))
+
+
+class QueryGuardMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = current_queries.get()
+        token = None
+        if stats is None:
+            stats = QueryStats()
+            token = current_queries.set(stats)
+        stats.shapes = Counter()
+
+        async def guarded_send(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Query-Count"] = str(stats.count)
+                route = f"{scope['method']} {route_template(scope)}"
+                problems = find_problems(stats, settings.query_budget(route), settings.n_plus_one_threshold)
+                if problems:
+                    report = f"{route}: {'; '.join(problems)}"
+                    if settings.query_guard_mode == "raise":
+                        raise QueryBudgetExceeded(report)
+                    logger.warning(report)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, guarded_send)
+        finally:
+            if token is not None:
+                current_queries.reset(token)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.coalescing import flights
+from src.metrics.instrumentation import registry
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(registry.render(flights), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/coalescing")
+async def get_coalescing_metrics():
+    return {name: flight.stats() for name, flight in sorted(flights.items())}
@@ -0,0 +1,119 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Mapping, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+SORT_LABEL = "_page_sort"
+KEY_LABEL = "_page_key"
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(list(values), default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Maximum number of items to return"),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+        sort: Optional[str] = Query(None, description="Field to sort by, prefixed with - for descending order"),
+        include_total: bool = Query(False, description="Return the total match count in X-Total-Count"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort = sort
+        self.include_total = include_total
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+    def apply_headers(self, response: Response):
+        if self.next_cursor:
+            response.headers["X-Next-Cursor"] = self.next_cursor
+        if self.total is not None:
+            response.headers["X-Total-Count"] = str(self.total)
+
+
+def _cursor_value(column, value):
+    python_type = column.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+    try:
+        if python_type in (datetime, date):
+            return python_type.fromisoformat(value)
+        return python_type(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _sort_column(sort: Optional[str], sortable: Mapping[str, Any], default: str) -> tuple[str, Any, bool]:
+    name = sort or default
+    descending = name.startswith("-")
+    field = name.lstrip("-")
+    if field not in sortable:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by {field}. Allowed: {', '.join(sortable)}")
+    return field, sortable[field], descending
+
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    key,
+    sortable: Mapping[str, Any],
+    params: Optional[PageParams] = None,
+    default_sort: str = "id",
+) -> Page:
+    # Keyset pagination on (sort column, key): stable under concurrent inserts and
+    # as cheap on the last page as on the first. Sortable columns must be NOT NULL.
+    params = params or PageParams(limit=DEFAULT_LIMIT, cursor=None, sort=None, include_total=False)
+    field, column, descending = _sort_column(params.sort, sortable, default_sort)
+    total = None
+    if params.include_total:
+        total = await session.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+    position = tuple_(column, key)
+    page_query = query.order_by(*(c.desc() if descending else c.asc() for c in (column, key)))
+    if params.cursor:
+        cursor_field, cursor_descending, value, last_key = decode_cursor(params.cursor, 4)
+        if cursor_field != field or cursor_descending != descending:
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+        boundary = tuple_(_cursor_value(column, value), _cursor_value(key, last_key))
+        page_query = page_query.where(position < boundary if descending else position > boundary)
+
+    descriptions = query.column_descriptions
+    entity = len(descriptions) == 1 and isinstance(descriptions[0]["expr"], type)
+    result = await session.execute(page_query.add_columns(column.label(SORT_LABEL), key.label(KEY_LABEL)).limit(params.limit + 1))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(field, descending, last[SORT_LABEL], last[KEY_LABEL])
+    if entity:
+        items = [row[0] for row in rows]
+    else:
+        items = [{name: value for name, value in row._asdict().items() if name not in (SORT_LABEL, KEY_LABEL)} for row in rows]
+    return Page(items=items, next_cursor=next_cursor, total=total)
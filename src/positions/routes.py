@@ -1,25 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from src.database import get_async_session
 from src.positions.models import Position
-from src.positions.schemas import PositionResponse, PositionDetailResponse
+from src.positions.schemas import PositionResponse, PositionDetailResponse, PortfolioSummary
 from src.positions.services import PositionService
+from src.http_cache import account_etag
+from src.responses import FastJSONResponse, fast_response
 
 router = APIRouter(prefix="/positions", tags=["Positions"])
 
-@router.get("/account/{account_id}", response_model=List[PositionDetailResponse])
-async def get_account_positions(account_id: int,session: AsyncSession = Depends(get_async_session)):
+@router.get("/account/{account_id}", response_model=List[PositionDetailResponse], response_class=FastJSONResponse, dependencies=[Depends(account_etag)])
+async def get_account_positions(account_id: int, response: Response, session: AsyncSession = Depends(get_async_session)):
     positions = await PositionService.get_account_positions_with_details(account_id, session)
-    return positions
+    return fast_response(positions, response)
 
-@router.get("/account/{account_id}/summary")
-async def get_portfolio_summary(account_id: int, session: AsyncSession = Depends(get_async_session)):
+@router.get("/account/{account_id}/summary", response_model=PortfolioSummary, response_class=FastJSONResponse, dependencies=[Depends(account_etag)])
+async def get_portfolio_summary(account_id: int, response: Response, session: AsyncSession = Depends(get_async_session)):
     summary = await PositionService.get_portfolio_summary(account_id, session)
-    return summary
+    return fast_response(summary, response)
 
-@router.get("/account/{account_id}/stock/{stock_id}", response_model=PositionDetailResponse)
+@router.get("/account/{account_id}/stock/{stock_id}", response_model=PositionDetailResponse, dependencies=[Depends(account_etag)])
 async def get_specific_position(account_id: int, stock_id: int, session: AsyncSession = Depends(get_async_session)):
     position = await PositionService.get_position_with_details(account_id, stock_id, session) 
     if not position:
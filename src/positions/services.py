@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, Select, Float
 from fastapi import HTTPException
 from src.positions.models import Position
 from src.stocks.models import Stock
@@ -11,6 +11,50 @@ from typing import Optional
 
 
 class PositionService:
+    @staticmethod
+    def valued_positions_query(*criteria) -> Select:
+        average_price = (
+            select(func.coalesce(func.sum(Trade.amount) / func.nullif(func.sum(Trade.quantity), 0, type_=Float), 0.0))
+            .where(Trade.account_id == Position.account_id, Trade.stock_id == Position.stock_id, Trade.type == "BUY_STOCK")
+            .scalar_subquery()
+        )
+        return (
+            select(
+                Position.account_id,
+                Account.user_id,
+                Position.stock_id,
+                Stock.name.label("stock_name"),
+                Stock.symbol.label("stock_ticker"),
+                Position.quantity,
+                average_price.label("average_purchase_price"),
+                Stock.average_price.label("current_market_price"),
+                Position.created_at,
+                Position.updated_at,
+            )
+            .join(Account, Account.id == Position.account_id)
+            .join(Stock, Stock.id == Position.stock_id)
+            .where(Position.quantity > 0, *criteria)
+        )
+
+    @staticmethod
+    def holdings_query(*criteria) -> Select:
+        positions = PositionService.valued_positions_query(*criteria).subquery()
+        current_value = func.sum(positions.c.quantity * positions.c.current_market_price)
+        return (
+            select(
+                positions.c.stock_id,
+                positions.c.stock_name,
+                positions.c.stock_ticker,
+                positions.c.current_market_price,
+                func.count(positions.c.account_id).label("accounts"),
+                func.sum(positions.c.quantity).label("quantity"),
+                func.sum(positions.c.quantity * positions.c.average_purchase_price).label("total_invested"),
+                current_value.label("current_value"),
+            )
+            .group_by(positions.c.stock_id, positions.c.stock_name, positions.c.stock_ticker, positions.c.current_market_price)
+            .order_by(current_value.desc(), positions.c.stock_id)
+        )
+
     @staticmethod
     async def get_account_positions_with_details(account_id: int, session: AsyncSession) -> list[PositionDetailResponse]:
         await PositionService._verify_account_exists(account_id, session)        
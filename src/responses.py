@@ -0,0 +1,32 @@
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# OPT_UTC_Z matches pydantic's "Z" suffix for UTC datetimes.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    # Response models here are plain field containers without aliases or custom
+    # serializers, so their field dict is their JSON form.
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def fast_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    # Returning a response skips FastAPI's response_model validation and encoding,
+    # so this is only for service output that is already shaped like the model.
+    # Headers set by dependencies on the injected Response are carried over.
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select, func, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.stocks.models import Stock
+
+
+@dataclass
+class CorrelationArtifact:
+    version: int
+    as_of: Optional[date]
+    stock_ids: list[int]
+    symbols: list[str]
+    observations: int
+    covariance: np.ndarray
+    correlation: np.ndarray
+
+
+class _ReturnStats:
+    def __init__(self, stock_ids: list[int]):
+        size = len(stock_ids)
+        self.columns = {stock_id: column for column, stock_id in enumerate(stock_ids)}
+        self.closed_through: Optional[str] = None
+        self.base = np.full(size, np.nan)
+        self.count = 0
+        self.sums = np.zeros(size)
+        self.cross = np.zeros((size, size))
+        self.open_day: Optional[str] = None
+        self.open_row: Optional[np.ndarray] = None
+
+    def advance(self, rows: list) -> None:
+        dates = sorted({row.day for row in rows})
+        if not dates:
+            return
+        positions = {day: index for index, day in enumerate(dates)}
+        log_prices = np.full((len(dates) + 1, len(self.columns)), np.nan)
+        log_prices[0] = self.base
+        for row in rows:
+            column = self.columns.get(row.stock_id)
+            if column is not None and row.price and float(row.price) > 0:
+                log_prices[positions[row.day] + 1, column] = np.log(float(row.price))
+        # Forward-fill each stock's last known price so gaps count as a zero return.
+        filled_index = np.where(~np.isnan(log_prices), np.arange(len(log_prices))[:, None], 0)
+        log_prices = log_prices[np.maximum.accumulate(filled_index, axis=0), np.arange(log_prices.shape[1])]
+        returns = np.nan_to_num(np.diff(log_prices, axis=0))
+        if self.closed_through is None or dates[0] == self.closed_through:
+            # The first day has no previous close, and an already folded day only
+            # re-anchors the base prices.
+            dates, returns, log_prices = dates[1:], returns[1:], log_prices[1:]
+        if not dates:
+            return
+        closed = returns[:-1]
+        self.count += len(closed)
+        self.sums += closed.sum(axis=0)
+        self.cross += closed.T @ closed
+        if len(dates) > 1:
+            self.closed_through = dates[-2]
+            self.base = log_prices[-2]
+        # The newest day can still be rewritten by the bulk price path, so it stays
+        # out of the running sums and is added on top whenever an artifact is built.
+        self.open_day = dates[-1]
+        self.open_row = returns[-1]
+
+    def matrices(self) -> tuple[int, np.ndarray, np.ndarray]:
+        count, sums, cross = self.count, self.sums, self.cross
+        if self.open_row is not None:
+            count, sums, cross = count + 1, sums + self.open_row, cross + np.outer(self.open_row, self.open_row)
+        size = len(sums)
+        if count < 2:
+            return count, np.zeros((size, size)), np.eye(size)
+        covariance = (cross - np.outer(sums, sums) / count) / (count - 1)
+        deviation = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(deviation, deviation)
+        correlation = np.nan_to_num(np.clip(correlation, -1.0, 1.0))
+        np.fill_diagonal(correlation, 1.0)
+        return count, covariance, correlation
+
+
+class CorrelationEngine:
+    def __init__(self, min_refresh_seconds: float = 60.0):
+        self.min_refresh_seconds = min_refresh_seconds
+        self.artifact: Optional[CorrelationArtifact] = None
+        self._stats: Optional[_ReturnStats] = None
+        self._universe = None
+        self._signature = None
+        self._symbols: list[str] = []
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _history_rows(since: Optional[str]):
+        entries = func.json_each_text(Stock.price_history).table_valued("key", "value").render_derived("entries")
+        query = (
+            select(Stock.id.label("stock_id"), func.left(entries.c.key, 10).label("day"), entries.c.value.label("price"))
+            .select_from(Stock)
+            .join(entries, true())
+        )
+        if since:
+            query = query.where(entries.c.key >= since)
+        return query
+
+    async def get(self, session: AsyncSession) -> CorrelationArtifact:
+        if self.artifact and time.monotonic() - self._checked_at < self.min_refresh_seconds:
+            return self.artifact
+        async with self._lock:
+            if self.artifact and time.monotonic() - self._checked_at < self.min_refresh_seconds:
+                return self.artifact
+            await self._refresh(session)
+            self._checked_at = time.monotonic()
+            return self.artifact
+
+    async def _refresh(self, session: AsyncSession):
+        signature_result = await session.execute(select(func.count(Stock.id), func.coalesce(func.sum(Stock.id), 0), func.max(Stock.updated_at)))
+        count, id_sum, last_update = signature_result.one()
+        if self.artifact and self._signature == (count, id_sum, last_update):
+            return
+        if self._stats is None or self._universe != (count, id_sum):
+            universe_result = await session.execute(select(Stock.id, Stock.symbol).order_by(Stock.id))
+            universe = universe_result.all()
+            self._stats = _ReturnStats([row.id for row in universe])
+            self._symbols = [row.symbol or f"STK{row.id}" for row in universe]
+            self._universe = (count, id_sum)
+        rows_result = await session.execute(self._history_rows(self._stats.closed_through))
+        self._stats.advance(rows_result.all())
+        observations, covariance, correlation = self._stats.matrices()
+        self._version += 1
+        self._signature = (count, id_sum, last_update)
+        self.artifact = CorrelationArtifact(
+            version=self._version,
+            as_of=date.fromisoformat(self._stats.open_day) if self._stats.open_day else None,
+            stock_ids=list(self._stats.columns),
+            symbols=self._symbols,
+            observations=observations,
+            covariance=covariance,
+            correlation=correlation,
+        )
+
+
+def top_peers(artifact: CorrelationArtifact, stock_id: int, k: int) -> list[dict]:
+    column = artifact.stock_ids.index(stock_id)
+    scores = artifact.correlation[column].copy()
+    scores[column] = -np.inf
+    k = min(k, len(scores) - 1)
+    if k <= 0:
+        return []
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best])]
+    return [
+        {"stock_id": artifact.stock_ids[index], "symbol": artifact.symbols[index], "correlation": round(float(scores[index]), 4)}
+        for index in best
+    ]
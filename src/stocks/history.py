@@ -0,0 +1,103 @@
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.cache import LRUCache
+
+INTERVALS = ("1d", "1w", "1M")
+
+
+def price_arrays(price_history: Optional[dict]) -> tuple[np.ndarray, np.ndarray]:
+    if not price_history:
+        return np.empty(0, dtype="datetime64[D]"), np.empty(0, dtype=float)
+    items = sorted((str(key)[:10], float(value)) for key, value in price_history.items() if value is not None)
+    dates = np.array([key for key, _ in items], dtype="datetime64[D]")
+    closes = np.array([value for _, value in items], dtype=float)
+    return dates, closes
+
+
+def daily_bars(dates: np.ndarray, closes: np.ndarray) -> dict[str, np.ndarray]:
+    return {"date": dates, "open": closes, "high": closes, "low": closes, "close": closes}
+
+
+def _bucket_keys(dates: np.ndarray, interval: str) -> np.ndarray:
+    if interval == "1w":
+        # numpy weeks start on Thursday (1970-01-01); shift so buckets start on Monday.
+        return (dates + 3).astype("datetime64[W]").astype("datetime64[D]") - 3
+    if interval == "1M":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    return dates
+
+
+def _aggregate(bars: dict[str, np.ndarray], keys: np.ndarray, labels: np.ndarray) -> dict[str, np.ndarray]:
+    if len(keys) == 0:
+        return bars
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    return {
+        "date": labels[starts],
+        "open": bars["open"][starts],
+        "high": np.maximum.reduceat(bars["high"], starts),
+        "low": np.minimum.reduceat(bars["low"], starts),
+        "close": bars["close"][ends],
+    }
+
+
+def resample(bars: dict[str, np.ndarray], interval: str) -> dict[str, np.ndarray]:
+    if interval == "1d":
+        return bars
+    keys = _bucket_keys(bars["date"], interval)
+    return _aggregate(bars, keys, keys)
+
+
+def slice_range(bars: dict[str, np.ndarray], start: Optional[date], end: Optional[date]) -> dict[str, np.ndarray]:
+    dates = bars["date"]
+    lo = np.searchsorted(dates, np.datetime64(start, "D")) if start else 0
+    hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right") if end else len(dates)
+    return {name: values[lo:hi] for name, values in bars.items()}
+
+
+def downsample(bars: dict[str, np.ndarray], max_points: Optional[int]) -> dict[str, np.ndarray]:
+    count = len(bars["date"])
+    if not max_points or count <= max_points:
+        return bars
+    step = -(-count // max_points)
+    return _aggregate(bars, np.arange(count) // step, bars["date"])
+
+
+def bars_to_rows(bars: dict[str, np.ndarray]) -> list[dict]:
+    columns = [bars["date"].astype(object)] + [bars[name].tolist() for name in ("open", "high", "low", "close")]
+    return [
+        {"date": day, "open": o, "high": h, "low": l, "close": c}
+        for day, o, h, l, c in zip(*columns)
+    ]
+
+
+class HistoryRollups:
+    def __init__(self, price_history: Optional[dict]):
+        self._bars = {"1d": daily_bars(*price_arrays(price_history))}
+
+    def bars(self, interval: str) -> dict[str, np.ndarray]:
+        if interval not in self._bars:
+            self._bars[interval] = resample(self._bars["1d"], interval)
+        return self._bars[interval]
+
+
+rollup_cache = LRUCache(maxsize=2048)
+
+
+def get_cached_rollups(stock_id: int, version) -> Optional[HistoryRollups]:
+    entry = rollup_cache.get(stock_id)
+    if entry and entry[0] == version:
+        return entry[1]
+    return None
+
+
+def store_rollups(stock_id: int, version, rollups: HistoryRollups):
+    rollup_cache.set(stock_id, (version, rollups))
+
+
+def invalidate_rollups(stock_ids: Iterable[int]):
+    for stock_id in stock_ids:
+        rollup_cache.pop(stock_id)
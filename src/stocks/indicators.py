@@ -0,0 +1,131 @@
+import re
+from typing import Callable
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.cache import LRUCache
+
+INDICATOR_PATTERN = re.compile(r"^(sma|ema|rsi|bb)(\d{1,3})$")
+MACD_PATTERN = re.compile(r"^macd(?:(\d{1,3})_(\d{1,3})_(\d{1,3}))?$")
+EMA_BLOCK = 128
+
+
+def _empty(length: int) -> np.ndarray:
+    return np.full(length, np.nan)
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    out = _empty(len(values))
+    if len(values) >= period:
+        sums = np.cumsum(np.r_[0.0, values])
+        out[period - 1:] = (sums[period:] - sums[:-period]) / period
+    return out
+
+
+def _smooth(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    # y[j] = (1 - a) * y[j-1] + a * x[j] in closed form: with d[j] = (1 - a)^(j + 1),
+    # y[j] = d[j] * (seed + a * cumsum(x / d)[j]). Blocks keep 1 / d inside float range.
+    out = np.empty(len(values))
+    previous = seed
+    for start in range(0, len(values), EMA_BLOCK):
+        chunk = values[start:start + EMA_BLOCK]
+        decay = (1 - alpha) ** np.arange(1, len(chunk) + 1)
+        block = decay * (previous + alpha * np.cumsum(chunk / decay))
+        out[start:start + len(chunk)] = block
+        previous = block[-1]
+    return out
+
+
+def ema(values: np.ndarray, period: int, alpha: float | None = None) -> np.ndarray:
+    out = _empty(len(values))
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < period:
+        return out
+    first = valid[0]
+    seed_index = first + period - 1
+    out[seed_index] = values[first:seed_index + 1].mean()
+    out[seed_index + 1:] = _smooth(values[seed_index + 1:], alpha or 2 / (period + 1), out[seed_index])
+    return out
+
+
+def rsi(closes: np.ndarray, period: int) -> np.ndarray:
+    out = _empty(len(closes))
+    if len(closes) <= period:
+        return out
+    deltas = np.diff(closes)
+    gains = np.r_[np.nan, np.clip(deltas, 0, None)]
+    losses = np.r_[np.nan, np.clip(-deltas, 0, None)]
+    avg_gain = ema(gains, period, alpha=1 / period)
+    avg_loss = ema(losses, period, alpha=1 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[(avg_loss == 0) & ~np.isnan(avg_gain)] = 100.0
+    return out
+
+
+def bollinger(closes: np.ndarray, period: int, width: float = 2.0) -> dict[str, np.ndarray]:
+    middle = sma(closes, period)
+    deviation = _empty(len(closes))
+    if len(closes) >= period:
+        deviation[period - 1:] = sliding_window_view(closes, period).std(axis=1)
+    return {"middle": middle, "upper": middle + width * deviation, "lower": middle - width * deviation}
+
+
+def macd(closes: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> dict[str, np.ndarray]:
+    line = ema(closes, fast) - ema(closes, slow)
+    signal_line = ema(line, signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def parse_indicators(raw: str) -> dict[str, Callable[[np.ndarray], dict[str, np.ndarray]]]:
+    indicators = {}
+    for name in (token.strip().lower() for token in raw.split(",")):
+        if not name:
+            continue
+        match = INDICATOR_PATTERN.match(name)
+        if match:
+            kind, period = match.group(1), int(match.group(2))
+            if not 2 <= period <= 500:
+                raise ValueError(f"Period out of range for {name} (2-500)")
+            if kind == "sma":
+                indicators[name] = lambda closes, p=period: {"value": sma(closes, p)}
+            elif kind == "ema":
+                indicators[name] = lambda closes, p=period: {"value": ema(closes, p)}
+            elif kind == "rsi":
+                indicators[name] = lambda closes, p=period: {"value": rsi(closes, p)}
+            else:
+                indicators[name] = lambda closes, p=period: bollinger(closes, p)
+            continue
+        match = MACD_PATTERN.match(name)
+        if match:
+            fast, slow, signal = (int(value) for value in match.groups()) if match.group(1) else (12, 26, 9)
+            if not 2 <= fast < slow <= 500 or not 2 <= signal <= 500:
+                raise ValueError(f"Invalid MACD periods for {name}")
+            indicators[name] = lambda closes, f=fast, s=slow, g=signal: macd(closes, f, s, g)
+            continue
+        raise ValueError(f"Unknown indicator: {name}")
+    if not indicators:
+        raise ValueError("No indicators requested")
+    return indicators
+
+
+def _to_list(values: np.ndarray) -> list:
+    return [None if np.isnan(value) else round(value, 4) for value in values.tolist()]
+
+
+indicator_cache = LRUCache(maxsize=8192)
+
+
+def compute_indicators(stock_id: int, dates: np.ndarray, closes: np.ndarray, raw: str) -> dict[str, dict[str, list]]:
+    indicators = parse_indicators(raw)
+    version = (dates[-1].item(), float(closes[-1])) if len(dates) else None
+    results = {}
+    for name, compute in indicators.items():
+        key = (stock_id, name, version)
+        cached = indicator_cache.get(key)
+        if cached is None:
+            cached = {series: _to_list(values) for series, values in compute(closes).items()}
+            indicator_cache.set(key, cached)
+        results[name] = cached
+    return results
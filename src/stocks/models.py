@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Text, Float, DateTime, func, JSON
+from sqlalchemy import Integer, Text, Float, DateTime, func, JSON, literal_column
 from src.database import Base
 from datetime import datetime
 from typing import List
@@ -12,10 +12,12 @@ class Stock(Base):
     name: Mapped[str] = mapped_column(Text, unique=True, index=True)
     symbol: Mapped[str | None] = mapped_column(Text, unique=True, nullable=True, index=True)
     average_price: Mapped[float] = mapped_column(Float, default=0.0)
-    price_history: Mapped[dict] = mapped_column(JSON, nullable=True, default=dict)
+    price_history: Mapped[dict] = mapped_column(JSON, nullable=True, default=dict, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Bumped inside every UPDATE (ORM or Core), so it moves at write time whatever the commit order.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", onupdate=literal_column("version") + 1)
 
     #Relationships-Parent
-    positions: Mapped[List["Position"]] = relationship("Position", back_populates="stock", cascade="all, delete-orphan")  # type: ignore
-    trades: Mapped[List["Trade"]] = relationship("Trade", back_populates="stock", cascade="all, delete-orphan")  # type: ignore
\ No newline at end of file
+    positions: Mapped[List["Position"]] = relationship("Position", back_populates="stock", cascade="all, delete-orphan", passive_deletes=True)  # type: ignore
+    trades: Mapped[List["Trade"]] = relationship("Trade", back_populates="stock", cascade="all, delete-orphan", passive_deletes=True)  # type: ignore
\ No newline at end of file
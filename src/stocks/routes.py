@@ -1,19 +1,38 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database import get_async_session
+from datetime import date
+from typing import Literal
+from src.database import get_async_session, get_read_session
 from src.stocks.models import Stock
 from src.stocks.services import StockService
+from src.stocks.stream import stream_prices
+from src.coalescing import coalesce
+from src.pagination import PageParams
+from src.http_cache import stocks_etag
+from src.responses import FastJSONResponse, fast_response
 from sqlalchemy import select
-from src.stocks.schemas import StockResponse, StockCreate, StockUpdate
+from src.stocks.schemas import StockResponse, StockListResponse, StockCreate, StockUpdate, StockPriceBulkUpdate, PriceHistoryResponse, IndicatorResponse, CorrelationMatrixResponse, CorrelatedPeersResponse
 
 router = APIRouter(prefix="/stocks", tags=["Stocks"])
 
+shared_market_overview = coalesce("market_overview", StockService.get_market_overview)
 
-@router.get("/", response_model=List[StockResponse])
-async def get_stocks(session: AsyncSession = Depends(get_async_session)):
-    result = await StockService.get_all_stocks(session)
-    return result
+
+@router.get("/", response_model=List[StockListResponse], response_class=FastJSONResponse, dependencies=[Depends(stocks_etag)])
+async def get_stocks(
+    response: Response,
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,name,symbol,average_price"),
+    include: str | None = Query(None, description="Set to 'history' to include price_history"),
+    min_price: float | None = Query(None, ge=0, description="Only stocks priced at or above this"),
+    max_price: float | None = Query(None, ge=0, description="Only stocks priced at or below this"),
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_read_session)):
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    result = await StockService.get_all_stocks(session, selected, include == "history", min_price, max_price, page)
+    result.apply_headers(response)
+    # Items only carry the selected fields, which is what exclude_unset used to produce.
+    return fast_response(result.items, response)
 
 
 @router.post("/", response_model=StockResponse, status_code=201)
@@ -22,45 +41,93 @@ async def create_stock(payload: StockCreate, session: AsyncSession = Depends(get
     return new_stock
 
 
-@router.get("/performance/top", tags=["Stock Performance"])
-async def get_top_performers(limit: int = 10, session: AsyncSession = Depends(get_async_session)):
+@router.post("/prices")
+async def update_prices(payload: StockPriceBulkUpdate, session: AsyncSession = Depends(get_async_session)):
+    updated = await StockService.update_prices(payload, session)
+    return {"updated": updated}
+
+
+@router.websocket("/stream")
+async def stream_stock_prices(websocket: WebSocket, symbols: str | None = None):
+    await stream_prices(websocket, symbols)
+
+
+@router.get("/performance/top", tags=["Stock Performance"], dependencies=[Depends(stocks_etag)])
+async def get_top_performers(limit: int = 10, session: AsyncSession = Depends(get_read_session)):
     performers = await StockService.get_top_stocks_performers(session, limit)
     return {"count": len(performers), "stocks": performers}
 
 
-@router.get("/performance/worst", tags=["Stock Performance"])
-async def get_worst_performers(limit: int = 10, session: AsyncSession = Depends(get_async_session)):
+@router.get("/performance/worst", tags=["Stock Performance"], dependencies=[Depends(stocks_etag)])
+async def get_worst_performers(limit: int = 10, session: AsyncSession = Depends(get_read_session)):
     performers = await StockService.get_worst_stocks_performers(session, limit)
     return {"count": len(performers), "stocks": performers}
 
 
-@router.get("/performance/overview", tags=["Stock Performance"])
-async def get_market_overview(session: AsyncSession = Depends(get_async_session)):
-    overview = await StockService.get_market_overview(session)
+@router.get("/performance/overview", tags=["Stock Performance"], dependencies=[Depends(stocks_etag)])
+async def get_market_overview():
+    overview = await shared_market_overview()
     return overview
 
 
 @router.get("/most-traded", response_model=dict)
-async def get_most_traded_stocks(limit: int = 10, session: AsyncSession = Depends(get_async_session)):
+async def get_most_traded_stocks(limit: int = 10, session: AsyncSession = Depends(get_read_session)):
     most_traded_stocks = await StockService.get_most_traded_stocks(session, limit)
     return {"count":len(most_traded_stocks), "stocks": most_traded_stocks}
 
 
+@router.get("/correlations", response_model=CorrelationMatrixResponse)
+async def get_correlation_matrix(kind: Literal["correlation", "covariance"] = "correlation", session: AsyncSession = Depends(get_read_session)):
+    matrix = await StockService.get_correlation_matrix(session, kind)
+    return matrix
+
+
 @router.get("/search", response_model=list[StockResponse])
-async def search_stocks(query: str, session: AsyncSession = Depends(get_async_session)):
+async def search_stocks(query: str, session: AsyncSession = Depends(get_read_session)):
     stocks_list = await StockService.search_stocks(query, session)
     return stocks_list
 
 
 @router.get("/{stock_id}", response_model=StockResponse)
-async def get_stock(stock_id: int, session: AsyncSession = Depends(get_async_session)):
+async def get_stock(stock_id: int, session: AsyncSession = Depends(get_read_session)):
     result = await StockService.get_stock_with_details(stock_id, session)
     return result
 
 
+@router.get("/{stock_id}/history", response_model=PriceHistoryResponse)
+async def get_price_history(
+    stock_id: int,
+    start: date | None = Query(None, alias="from", description="First bar date (inclusive)"),
+    end: date | None = Query(None, alias="to", description="Last bar date (inclusive)"),
+    interval: Literal["1d", "1w", "1M"] = Query("1d", description="Bar resolution"),
+    max_points: int | None = Query(None, ge=2, le=5000, description="Merge bars so at most this many are returned"),
+    session: AsyncSession = Depends(get_read_session)):
+    history = await StockService.get_price_history(stock_id, session, start, end, interval, max_points)
+    return history
+
+
+@router.get("/{stock_id}/indicators", response_model=IndicatorResponse)
+async def get_indicators(
+    stock_id: int,
+    indicator_set: str = Query("sma20,ema20,rsi14,bb20,macd", alias="set", description="Comma-separated indicators: smaN, emaN, rsiN, bbN, macd or macdF_S_G"),
+    session: AsyncSession = Depends(get_read_session)):
+    indicators = await StockService.get_indicators(stock_id, indicator_set, session)
+    return indicators
+
+
+@router.get("/{stock_id}/peers", response_model=CorrelatedPeersResponse)
+async def get_correlated_peers(stock_id: int, k: int = Query(5, ge=1, le=50, description="Number of peers to return"), session: AsyncSession = Depends(get_read_session)):
+    peers = await StockService.get_correlated_peers(stock_id, session, k)
+    return peers
+
+
 @router.get("/{stock_id}/holders")
-async def get_stock_holders(stock_id: int, session: AsyncSession = Depends(get_async_session)):
-    stock_holders = await StockService.get_stock_holders(stock_id, session)
+async def get_stock_holders(
+    stock_id: int,
+    limit: int = Query(100, ge=1, le=1000, description="Number of holders to return"),
+    cursor: str | None = Query(None, description="Cursor from a previous page's next_cursor"),
+    session: AsyncSession = Depends(get_read_session)):
+    stock_holders = await StockService.get_stock_holders(stock_id, session, limit, cursor)
     return stock_holders
 
 
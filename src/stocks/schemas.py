@@ -1,7 +1,7 @@
 from src.schemas import CustomBase
 from pydantic import PositiveInt, Field, field_validator, PositiveFloat
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, date
+from typing import Optional, List, Literal, Dict
 import re
 
 class StockCreate(CustomBase):
@@ -30,6 +30,15 @@ class StockResponse(CustomBase):
     class Config:
         from_attributes = True
 
+class StockListResponse(CustomBase):
+    id: PositiveInt
+    name: Optional[str] = None
+    symbol: Optional[str] = None
+    average_price: Optional[float] = Field(None, description="Current market price")
+    price_history: Optional[dict] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
 class StockUpdate(CustomBase):
     name: Optional[str] = Field(None, min_length=1, max_length=100, examples=["Apple Inc."])
     symbol: Optional[str] = Field(None, min_length=1, max_length=10, examples=["AAPL"])
@@ -55,4 +64,54 @@ class StockSearchResponse(CustomBase):
     average_price: float
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class StockPriceUpdate(CustomBase):
+    stock_id: PositiveInt
+    price: PositiveFloat = Field(..., examples=[151.20], description="New market price")
+
+class StockPriceBulkUpdate(CustomBase):
+    prices: List[StockPriceUpdate] = Field(..., min_length=1)
+
+class OHLCBar(CustomBase):
+    date: date
+    open: float
+    high: float
+    low: float
+    close: float
+
+class PriceHistoryResponse(CustomBase):
+    stock_id: PositiveInt
+    symbol: Optional[str] = None
+    interval: Literal["1d", "1w", "1M"]
+    count: int = Field(..., description="Number of bars returned")
+    bars: List[OHLCBar] = Field(default_factory=list)
+
+class IndicatorResponse(CustomBase):
+    stock_id: PositiveInt
+    symbol: Optional[str] = None
+    last_price_date: Optional[date] = None
+    dates: List[date] = Field(default_factory=list)
+    indicators: Dict[str, Dict[str, List[Optional[float]]]] = Field(default_factory=dict, description="Series per indicator, aligned with dates")
+
+class CorrelationMatrixResponse(CustomBase):
+    version: int = Field(..., description="Artifact version, bumped on every refresh")
+    as_of: Optional[date] = None
+    kind: Literal["correlation", "covariance"]
+    observations: int = Field(..., description="Number of daily returns used")
+    stock_ids: List[int]
+    symbols: List[str]
+    matrix: List[List[float]]
+
+class CorrelatedPeer(CustomBase):
+    stock_id: PositiveInt
+    symbol: str
+    correlation: float
+
+class CorrelatedPeersResponse(CustomBase):
+    stock_id: PositiveInt
+    symbol: str
+    version: int
+    as_of: Optional[date] = None
+    observations: int
+    peers: List[CorrelatedPeer] = Field(default_factory=list)
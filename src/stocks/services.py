@@ -1,14 +1,38 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, delete, func, desc, and_, or_, update, bindparam, cast, literal, Float, String, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import undefer
 from fastapi import HTTPException
 from src.stocks.models import Stock
 from src.positions.models import Position
 from src.accounts.models import Account
-from src.stocks.schemas import StockCreate, StockUpdate, StockDetailResponse
+from src.stocks.schemas import StockCreate, StockUpdate, StockDetailResponse, StockPriceBulkUpdate
+from src.stocks.stream import price_hub, price_update
+from src.pagination import Page, PageParams, encode_cursor, decode_cursor, paginate
+from src.stocks.indicators import compute_indicators
+from src.stocks.correlation import CorrelationEngine, top_peers
+from src.config import settings
+from src.feeds.leaderboard import LeaderboardService
+from src.feeds.profiles import invalidate_profiles
+from src.feeds.trending import invalidate_trending
+from src.stocks.history import HistoryRollups, get_cached_rollups, store_rollups, invalidate_rollups, slice_range, downsample, bars_to_rows
 from typing import Optional, List, Dict
-from datetime import datetime, timedelta
-import random
-import math
+from datetime import datetime, timezone, date
+
+
+STOCK_FIELDS = ("id", "name", "symbol", "average_price", "price_history", "created_at", "updated_at")
+DEFAULT_LIST_FIELDS = ("id", "name", "symbol", "average_price", "updated_at")
+STOCK_SORT_FIELDS = {
+    "id": Stock.id,
+    "name": Stock.name,
+    "average_price": Stock.average_price,
+    "created_at": Stock.created_at,
+    "updated_at": Stock.updated_at,
+}
+REFRESH_ATTRIBUTES = ["name", "symbol", "average_price", "price_history", "created_at", "updated_at"]
+
+
+correlation_engine = CorrelationEngine(min_refresh_seconds=settings.correlation_refresh_seconds)
 
 
 class StockService:
@@ -28,18 +52,44 @@ class StockService:
         new_stock = Stock(name=payload.name, symbol=payload.symbol, average_price=payload.average_price)
         session.add(new_stock)
         await session.commit()
-        await session.refresh(new_stock)
+        await session.refresh(new_stock, REFRESH_ATTRIBUTES)
         return new_stock
     
     @staticmethod
-    async def get_all_stocks(session: AsyncSession) -> list[Stock]:
-        query = select(Stock)
-        result = await session.scalars(query)
-        return list(result.all())
+    async def catalog_version(session: AsyncSession) -> tuple:
+        # Each committed update adds one to the version sum, deletes drop the count and
+        # inserts raise the max id, so any change moves the tuple. updated_at is the
+        # transaction start time and can commit out of order, so it is not used here.
+        result = await session.execute(select(func.count(Stock.id), func.max(Stock.id), func.coalesce(func.sum(Stock.version), 0)))
+        return tuple(result.one())
+
+    @staticmethod
+    async def get_all_stocks(
+        session: AsyncSession,
+        fields: Optional[List[str]] = None,
+        include_history: bool = False,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        page: Optional[PageParams] = None,
+    ) -> Page:
+        selected = list(fields or DEFAULT_LIST_FIELDS)
+        unknown = [field for field in selected if field not in STOCK_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(STOCK_FIELDS)}")
+        if "id" not in selected:
+            selected.insert(0, "id")
+        if include_history and "price_history" not in selected:
+            selected.append("price_history")
+        query = select(*(getattr(Stock, field) for field in selected))
+        if min_price is not None:
+            query = query.where(Stock.average_price >= min_price)
+        if max_price is not None:
+            query = query.where(Stock.average_price <= max_price)
+        return await paginate(session, query, Stock.id, STOCK_SORT_FIELDS, page)
 
     @staticmethod
     async def get_stock_with_details(stock_id: int, session: AsyncSession) -> StockDetailResponse:
-        stock_query = select(Stock).where(Stock.id == stock_id)
+        stock_query = select(Stock).where(Stock.id == stock_id).options(undefer(Stock.price_history))
         stock_result = await session.scalars(stock_query)
         stock = stock_result.first()
         if not stock:
@@ -71,41 +121,180 @@ class StockService:
         update_data = payload.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(stock, field, value)
+        if "average_price" in update_data:
+            await session.flush()
+            await LeaderboardService.refresh_stock_holders([stock_id], session)
         await session.commit()
-        await session.refresh(stock)
+        await session.refresh(stock, REFRESH_ATTRIBUTES)
+        if "average_price" in update_data:
+            price_hub.publish([price_update(stock.id, stock.symbol, stock.average_price, stock.updated_at)])
         return stock
 
+    @staticmethod
+    async def update_prices(payload: StockPriceBulkUpdate, session: AsyncSession) -> int:
+        prices = {item.stock_id: item.price for item in payload.prices}
+        known_query = select(Stock.id, Stock.symbol).where(Stock.id.in_(prices.keys()))
+        known_result = await session.execute(known_query)
+        symbols = {row.id: row.symbol for row in known_result.all()}
+        missing = sorted(set(prices) - set(symbols))
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Stocks not found: {missing}")
+        await StockService.apply_prices(prices, symbols, session)
+        return len(prices)
+
+    @staticmethod
+    async def apply_prices(prices: Dict[int, float], symbols: Dict[int, Optional[str]], session: AsyncSession, refresh_leaderboard: bool = True):
+        await StockService._write_prices(prices, session)
+        await session.commit()
+        invalidate_rollups(prices.keys())
+        now = datetime.now(timezone.utc)
+        price_hub.publish(price_update(stock_id, symbols.get(stock_id), price, now) for stock_id, price in prices.items())
+        # The leaderboard is refreshed in its own transaction so price writes never
+        # wait on, or hold locks for, the leaderboard upsert. The simulator skips
+        # this and rebuilds the leaderboard on its own slower cadence.
+        if refresh_leaderboard:
+            await LeaderboardService.refresh_stock_holders(prices.keys(), session)
+            await session.commit()
+
+    @staticmethod
+    async def _write_prices(prices: Dict[int, float], session: AsyncSession):
+        stocks = Stock.__table__
+        day = datetime.now(timezone.utc).date().isoformat()
+        history = func.coalesce(cast(stocks.c.price_history, JSONB), cast(literal("{}"), JSONB)).op("||")(
+            func.jsonb_build_object(bindparam("b_day", type_=String), bindparam("b_price", type_=Float))
+        )
+        stmt = (
+            update(stocks)
+            .where(stocks.c.id == bindparam("b_id"))
+            .values(average_price=bindparam("b_price", type_=Float), price_history=cast(history, JSON))
+        )
+        await session.execute(stmt, [{"b_id": stock_id, "b_price": price, "b_day": day} for stock_id, price in prices.items()])
+
+    @staticmethod
+    async def get_price_history(stock_id: int, session: AsyncSession, start: Optional[date] = None, end: Optional[date] = None, interval: str = "1d", max_points: Optional[int] = None) -> dict:
+        stock, rollups = await StockService._get_rollups(stock_id, session)
+        bars = downsample(slice_range(rollups.bars(interval), start, end), max_points)
+        rows = bars_to_rows(bars)
+        return {"stock_id": stock.id, "symbol": stock.symbol, "interval": interval, "count": len(rows), "bars": rows}
+
+    @staticmethod
+    async def get_indicators(stock_id: int, indicator_set: str, session: AsyncSession) -> dict:
+        stock, rollups = await StockService._get_rollups(stock_id, session)
+        daily = rollups.bars("1d")
+        try:
+            indicators = compute_indicators(stock.id, daily["date"], daily["close"], indicator_set)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        dates = daily["date"].astype(object).tolist()
+        return {"stock_id": stock.id, "symbol": stock.symbol, "last_price_date": dates[-1] if dates else None, "dates": dates, "indicators": indicators}
+
+    @staticmethod
+    async def get_correlation_matrix(session: AsyncSession, kind: str = "correlation") -> dict:
+        artifact = await correlation_engine.get(session)
+        matrix = artifact.correlation if kind == "correlation" else artifact.covariance
+        return {
+            "version": artifact.version,
+            "as_of": artifact.as_of,
+            "kind": kind,
+            "observations": artifact.observations,
+            "stock_ids": artifact.stock_ids,
+            "symbols": artifact.symbols,
+            "matrix": matrix.round(6).tolist(),
+        }
+
+    @staticmethod
+    async def get_correlated_peers(stock_id: int, session: AsyncSession, k: int = 5) -> dict:
+        artifact = await correlation_engine.get(session)
+        if stock_id not in artifact.stock_ids:
+            await StockService.validate_stock_exists(stock_id, session)
+            raise HTTPException(status_code=409, detail="Correlations for this stock are not available yet")
+        return {
+            "stock_id": stock_id,
+            "symbol": artifact.symbols[artifact.stock_ids.index(stock_id)],
+            "version": artifact.version,
+            "as_of": artifact.as_of,
+            "observations": artifact.observations,
+            "peers": top_peers(artifact, stock_id, k),
+        }
+
+    @staticmethod
+    async def _get_rollups(stock_id: int, session: AsyncSession):
+        stock_query = select(Stock.id, Stock.symbol, Stock.updated_at).where(Stock.id == stock_id)
+        stock_result = await session.execute(stock_query)
+        stock = stock_result.first()
+        if not stock:
+            raise HTTPException(status_code=404, detail="Stock not found")
+        rollups = get_cached_rollups(stock_id, stock.updated_at)
+        if rollups is None:
+            history_result = await session.execute(select(Stock.price_history).where(Stock.id == stock_id))
+            rollups = HistoryRollups(history_result.scalar_one_or_none())
+            store_rollups(stock_id, stock.updated_at, rollups)
+        return stock, rollups
+
     @staticmethod
     async def search_stocks(query: str, session: AsyncSession, limit: int = 20) -> list[Stock]:
-        search_query = select(Stock).where((Stock.name.ilike(f"%{query}%")) | (Stock.symbol.ilike(f"%{query}%"))).limit(limit)
+        search_query = select(Stock).where((Stock.name.ilike(f"%{query}%")) | (Stock.symbol.ilike(f"%{query}%"))).options(undefer(Stock.price_history)).limit(limit)
         result = await session.scalars(search_query)
         return list(result.all())
 
     
 
     @staticmethod
-    async def get_stock_holders(stock_id: int, session: AsyncSession) -> dict:
-        stock_query = select(Stock).where(Stock.id == stock_id)
-        stock_result = await session.scalars(stock_query)
+    async def get_stock_holders(stock_id: int, session: AsyncSession, limit: int = 100, cursor: Optional[str] = None) -> dict:
+        if cursor:
+            last_quantity, last_account_id = decode_cursor(cursor, 2)
+            try:
+                last_quantity, last_account_id = float(last_quantity), int(last_account_id)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        stock_query = select(Stock.id, Stock.name, Stock.symbol, Stock.average_price).where(Stock.id == stock_id)
+        stock_result = await session.execute(stock_query)
         stock = stock_result.first()
         if not stock:
             raise HTTPException(status_code=404, detail="Stock not found")
-        positions_query = select(Position).where(Position.stock_id == stock_id, Position.quantity > 0)
-        positions_result = await session.scalars(positions_query)
-        positions = positions_result.all()
-        holders = []
-        total_shares = 0
-        for position in positions:
-            account_query = select(Account).where(Account.id == position.account_id)
-            account_result = await session.scalars(account_query)
-            account = account_result.first()
-            if account:
-                total_shares += position.quantity
-                holders.append({"account_id": account.id, "account_name": account.name, "quantity": position.quantity, "last_updated": getattr(position, "updated_at", None)})
-        for holder in holders:
-            holder["ownership_percentage"] = ((holder["quantity"] / total_shares * 100) if total_shares > 0 else 0)
-        holders.sort(key=lambda x: x["quantity"], reverse=True)
-        return {"stock_id": stock_id, "stock_name": stock.name, "symbol": stock.symbol, "current_price": stock.average_price, "total_holders": len(holders), "total_shares_held": total_shares, "holders": holders}
+        total_shares = func.sum(Position.quantity).over()
+        holders = (
+            select(
+                Position.account_id,
+                Account.name.label("account_name"),
+                Position.quantity,
+                Position.updated_at.label("last_updated"),
+                (Position.quantity / total_shares * 100).label("ownership_percentage"),
+                func.count().over().label("total_holders"),
+                total_shares.label("total_shares_held"),
+            )
+            .join(Account, Account.id == Position.account_id)
+            .where(Position.stock_id == stock_id, Position.quantity > 0)
+            .subquery()
+        )
+        holders_query = select(holders).order_by(holders.c.quantity.desc(), holders.c.account_id)
+        if cursor:
+            holders_query = holders_query.where(
+                or_(holders.c.quantity < last_quantity, and_(holders.c.quantity == last_quantity, holders.c.account_id > last_account_id))
+            )
+        holders_result = await session.execute(holders_query.limit(limit + 1))
+        rows = holders_result.all()
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1].quantity, page[-1].account_id) if len(rows) > limit else None
+        return {
+            "stock_id": stock_id,
+            "stock_name": stock.name,
+            "symbol": stock.symbol,
+            "current_price": stock.average_price,
+            "total_holders": page[0].total_holders if page else 0,
+            "total_shares_held": page[0].total_shares_held if page else 0,
+            "holders": [
+                {
+                    "account_id": row.account_id,
+                    "account_name": row.account_name,
+                    "quantity": row.quantity,
+                    "last_updated": row.last_updated,
+                    "ownership_percentage": row.ownership_percentage,
+                }
+                for row in page
+            ],
+            "next_cursor": next_cursor,
+        }
 
     @staticmethod
     async def validate_stock_exists(stock_id: int, session: AsyncSession) -> Stock:
@@ -118,18 +307,20 @@ class StockService:
     
     @staticmethod
     async def delete_stock(stock_id: int, session: AsyncSession):
-        query = select(Stock).where(Stock.id == stock_id)
-        query_result = await session.scalars(query)
-        stock = query_result.first()
-        if not stock:
+        stock_exists = await session.scalar(select(Stock.id).where(Stock.id == stock_id))
+        if not stock_exists:
             raise HTTPException(status_code=404, detail="Stock not found")
-        await session.delete(stock)
+        holder_ids = await LeaderboardService.holder_user_ids(stock_id, session)
+        await session.execute(delete(Stock).where(Stock.id == stock_id))
+        await LeaderboardService.refresh_users(holder_ids, session)
         await session.commit()
+        invalidate_profiles(holder_ids)
+        await invalidate_trending(holder_ids, [stock_id])
         return None
     
     @staticmethod
     async def get_top_stocks_performers(session: AsyncSession, limit: int = 3) -> List[Dict]:
-        query = select(Stock)
+        query = select(Stock).options(undefer(Stock.price_history))
         result = await session.scalars(query)
         stocks = result.all()
         
@@ -163,7 +354,7 @@ class StockService:
     
     @staticmethod
     async def get_worst_stocks_performers(session: AsyncSession, limit: int = 3) -> List[Dict]:
-        query = select(Stock)
+        query = select(Stock).options(undefer(Stock.price_history))
         result = await session.scalars(query)
         stocks = result.all()
         
@@ -217,7 +408,7 @@ class StockService:
 
         ids = [int(r.id) for r in rows]
 
-        stocks_query = select(Stock).where(Stock.id.in_(ids))
+        stocks_query = select(Stock).where(Stock.id.in_(ids)).options(undefer(Stock.price_history))
         stocks_result = await session.scalars(stocks_query)
         stocks_list = stocks_result.all()
         stock_by_id = {s.id: s for s in stocks_list}
@@ -264,7 +455,7 @@ class StockService:
     async def get_market_overview(session: AsyncSession) -> Dict:
         top_performers = await StockService.get_top_stocks_performers(session, limit=10)
         worst_performers = await StockService.get_worst_stocks_performers(session, limit=10)        
-        query = select(Stock)
+        query = select(Stock).options(undefer(Stock.price_history))
         result = await session.scalars(query)
         all_stocks = result.all()        
         stocks_with_history = [s for s in all_stocks if s.price_history and len(s.price_history) >= 2]        
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import math
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select, func, text
+
+from src.config import settings
+from src.database import async_session_maker, engine
+from src.stocks.models import Stock
+from src.stocks.services import StockService
+from src.feeds.leaderboard import LeaderboardService
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+MIN_PRICE = 0.01
+# Only one process may drive prices; every worker competes for this
+# Postgres advisory lock and the holder runs the simulation.
+ADVISORY_LOCK_KEY = 7_301_030
+LEADER_RETRY_SECONDS = 30.0
+# A bigint advisory key shows up in pg_locks split into classid (high half)
+# and objid (low half), with objsubid 1.
+LEADER_CHECK = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND classid = 0 "
+    "AND objid = :key AND objsubid = 1 AND pid = pg_backend_pid() AND granted)"
+).bindparams(key=ADVISORY_LOCK_KEY)
+
+
+def gbm_step(prices: np.ndarray, drift: float, volatility: float, dt: float, rng: np.random.Generator, correlation: float = 0.0) -> np.ndarray:
+    shocks = rng.standard_normal(prices.shape[0])
+    if correlation > 0:
+        # Single-factor model: every stock shares one market shock, weighted so
+        # the pairwise correlation of the shocks equals `correlation`.
+        shocks = math.sqrt(correlation) * rng.standard_normal() + math.sqrt(1 - correlation) * shocks
+    growth = (drift - 0.5 * volatility ** 2) * dt + volatility * math.sqrt(dt) * shocks
+    return prices * np.exp(growth)
+
+
+class MarketSimulator:
+    def __init__(
+        self,
+        tick_seconds: float = 1.0,
+        drift: float = 0.05,
+        volatility: float = 0.25,
+        correlation: float = 0.0,
+        time_scale: float = 1.0,
+        universe_refresh_ticks: int = 60,
+        leaderboard_refresh_seconds: float = 30.0,
+        seed: Optional[int] = None,
+    ):
+        self.tick_seconds = tick_seconds
+        self.drift = drift
+        self.volatility = volatility
+        self.correlation = min(max(correlation, 0.0), 1.0)
+        self.dt = tick_seconds * time_scale / SECONDS_PER_YEAR
+        self.universe_refresh_ticks = max(universe_refresh_ticks, 1)
+        self.leaderboard_refresh_seconds = leaderboard_refresh_seconds
+        self._leaderboard_refreshed_at = float("-inf")
+        self.rng = np.random.default_rng(seed)
+        self.stock_ids = np.empty(0, dtype=np.int64)
+        self.prices = np.empty(0, dtype=float)
+        self.symbols: dict[int, Optional[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def load_universe(self):
+        async with async_session_maker() as session:
+            result = await session.execute(select(Stock.id, Stock.symbol, Stock.average_price).where(Stock.average_price > 0).order_by(Stock.id))
+            rows = result.all()
+        # Known stocks keep their full-precision simulated price. The stored value
+        # only wins for new stocks or when something else changed it since the
+        # last tick (it then no longer matches our rounded write).
+        previous = dict(zip(self.stock_ids.tolist(), self.prices.tolist()))
+        prices = []
+        for row in rows:
+            price = previous.get(row.id)
+            prices.append(price if price is not None and round(price, 2) == row.average_price else row.average_price)
+        self.stock_ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.prices = np.array(prices, dtype=float)
+        self.symbols = {row.id: row.symbol for row in rows}
+
+    def step(self) -> np.ndarray:
+        # Keep full precision between ticks; rounding the state itself would
+        # swallow the sub-cent moves of short ticks.
+        self.prices = np.maximum(gbm_step(self.prices, self.drift, self.volatility, self.dt, self.rng, self.correlation), MIN_PRICE)
+        return np.round(self.prices, 2)
+
+    async def tick(self):
+        if not len(self.stock_ids):
+            return
+        prices = dict(zip(self.stock_ids.tolist(), self.step().tolist()))
+        async with async_session_maker() as session:
+            await StockService.apply_prices(prices, self.symbols, session, refresh_leaderboard=False)
+
+    async def refresh_leaderboard(self):
+        # Every tick moves every price, so instead of re-ranking all holders each
+        # second the leaderboard is rebuilt on its own cadence, in its own transaction.
+        now = asyncio.get_running_loop().time()
+        if now - self._leaderboard_refreshed_at < self.leaderboard_refresh_seconds:
+            return
+        self._leaderboard_refreshed_at = now
+        async with async_session_maker() as session:
+            await LeaderboardService.rebuild(session)
+
+    async def run(self):
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    # Session-level lock on an autocommit connection, so holding it
+                    # never leaves a transaction idle for the simulator's lifetime.
+                    connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+                    if await connection.scalar(select(func.pg_try_advisory_lock(ADVISORY_LOCK_KEY))):
+                        logger.info("Market simulator acquired the leader lock")
+                        try:
+                            await self._run_ticks(connection)
+                        finally:
+                            await connection.scalar(select(func.pg_advisory_unlock(ADVISORY_LOCK_KEY)))
+            except Exception:
+                logger.exception("Market simulator lost its leader connection")
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+    async def _run_ticks(self, lock_connection):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        ticks = 0
+        while True:
+            # The lock lives as long as this connection; if it has dropped, another
+            # worker may already be leader, so confirm ownership before every tick.
+            if not await lock_connection.scalar(LEADER_CHECK):
+                logger.warning("Market simulator no longer holds the leader lock")
+                return
+            try:
+                if ticks % self.universe_refresh_ticks == 0:
+                    await self.load_universe()
+                await self.tick()
+                await self.refresh_leaderboard()
+            except Exception:
+                logger.exception("Market simulator tick failed")
+            ticks += 1
+            next_tick += self.tick_seconds
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Running behind: drop the missed ticks instead of bursting to catch up.
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+market_simulator = MarketSimulator(
+    tick_seconds=settings.market_sim_tick_seconds,
+    drift=settings.market_sim_drift,
+    volatility=settings.market_sim_volatility,
+    correlation=settings.market_sim_correlation,
+    time_scale=settings.market_sim_time_scale,
+    universe_refresh_ticks=settings.market_sim_universe_refresh_ticks,
+    leaderboard_refresh_seconds=settings.market_sim_leaderboard_refresh_seconds,
+)
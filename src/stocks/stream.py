@@ -0,0 +1,128 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+
+def stock_key(stock_id: int, symbol: Optional[str]) -> str:
+    return symbol or f"STK{stock_id}"
+
+
+def price_update(stock_id: int, symbol: Optional[str], price: float, timestamp: Optional[datetime] = None) -> dict:
+    return {
+        "stock_id": stock_id,
+        "symbol": stock_key(stock_id, symbol),
+        "price": price,
+        "timestamp": (timestamp or datetime.now(timezone.utc)).isoformat(),
+    }
+
+
+class PriceSubscriber:
+    def __init__(self):
+        self.symbols: set[str] = set()
+        self.pending: dict[str, dict] = {}
+        self.ready = asyncio.Event()
+
+    def push(self, symbol: str, update: dict):
+        # Only the newest quote per symbol is kept, so a slow consumer
+        # receives one coalesced batch instead of an ever-growing backlog.
+        self.pending[symbol] = update
+        self.ready.set()
+
+    async def next_batch(self) -> list[dict]:
+        await self.ready.wait()
+        self.ready.clear()
+        batch, self.pending = self.pending, {}
+        return list(batch.values())
+
+
+class PriceHub:
+    def __init__(self):
+        self._by_symbol: dict[str, set[PriceSubscriber]] = {}
+        self._latest: dict[str, dict] = {}
+        self._subscribers: set[PriceSubscriber] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def connect(self) -> PriceSubscriber:
+        subscriber = PriceSubscriber()
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: PriceSubscriber):
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+        self._subscribers.discard(subscriber)
+
+    def subscribe(self, subscriber: PriceSubscriber, symbols: Iterable[str]):
+        for symbol in symbols:
+            subscriber.symbols.add(symbol)
+            self._by_symbol.setdefault(symbol, set()).add(subscriber)
+            latest = self._latest.get(symbol)
+            if latest:
+                subscriber.push(symbol, latest)
+
+    def unsubscribe(self, subscriber: PriceSubscriber, symbols: Iterable[str]):
+        for symbol in symbols:
+            subscriber.symbols.discard(symbol)
+            subscriber.pending.pop(symbol, None)
+            listeners = self._by_symbol.get(symbol)
+            if listeners is not None:
+                listeners.discard(subscriber)
+                if not listeners:
+                    del self._by_symbol[symbol]
+
+    def publish(self, updates: Iterable[dict]):
+        for update in updates:
+            symbol = update["symbol"]
+            self._latest[symbol] = update
+            for subscriber in self._by_symbol.get(symbol, ()):
+                subscriber.push(symbol, update)
+
+
+price_hub = PriceHub()
+
+
+def parse_symbols(raw) -> list[str]:
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    return [str(symbol).strip().upper() for symbol in raw or [] if str(symbol).strip()]
+
+
+async def _send_batches(websocket: WebSocket, subscriber: PriceSubscriber):
+    while True:
+        batch = await subscriber.next_batch()
+        if batch:
+            await websocket.send_json({"type": "prices", "updates": batch})
+
+
+async def stream_prices(websocket: WebSocket, symbols: Optional[str] = None):
+    await websocket.accept()
+    subscriber = price_hub.connect()
+    price_hub.subscribe(subscriber, parse_symbols(symbols))
+    sender = asyncio.create_task(_send_batches(websocket, subscriber))
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message.get("action")
+                requested = parse_symbols(message.get("symbols"))
+            except (ValueError, AttributeError):
+                await websocket.send_json({"type": "error", "detail": "Invalid message"})
+                continue
+            if action == "subscribe":
+                price_hub.subscribe(subscriber, requested)
+            elif action == "unsubscribe":
+                price_hub.unsubscribe(subscriber, requested)
+            else:
+                await websocket.send_json({"type": "error", "detail": "Unknown action"})
+                continue
+            await websocket.send_json({"type": "subscribed", "symbols": sorted(subscriber.symbols)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        price_hub.disconnect(subscriber)
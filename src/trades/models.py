@@ -1,11 +1,12 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Text, func, DateTime, ForeignKey, Float
+from sqlalchemy import Integer, Text, func, DateTime, ForeignKey, Float, Index
 from src.database import Base
 from datetime import datetime
 
 
 class Trade(Base):
     __tablename__ = "trades"
+    __table_args__ = (Index("ix_trades_account_id_stock_id", "account_id", "stock_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id", ondelete="CASCADE", onupdate="CASCADE"))
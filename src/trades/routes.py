@@ -12,6 +12,7 @@ from src.trades.schemas import (
     DetailedBalanceResponse
 )
 from src.trades.services import TradeService
+from src.responses import FastJSONResponse, fast_response
 from datetime import datetime
 
 router = APIRouter(
@@ -38,7 +39,7 @@ async def transfer_between_accounts(payload: AccountTransferCreate, session: Asy
     return transfer
 
 
-@router.get("/account/{account_id}", response_model=List[TradeResponse])
+@router.get("/account/{account_id}", response_model=List[TradeResponse], response_class=FastJSONResponse)
 async def get_account_trades(
     account_id: int,
     trade_type: str | None = Query(
@@ -47,7 +48,7 @@ async def get_account_trades(
     ),
     session: AsyncSession = Depends(get_async_session)):
     trades = await TradeService.get_account_trades(account_id, session, trade_type)
-    return trades
+    return fast_response(trades)
 
 
 @router.get("/account/{account_id}/balance", response_model=BalanceResponse)
@@ -1,34 +1,68 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, or_, func, case
 from sqlalchemy.dialects.postgresql import insert
 from fastapi import HTTPException
 from src.trades.models import Trade
 from src.accounts.models import Account
 from src.stocks.models import Stock
 from src.positions.models import Position
-from src.trades.schemas import MoneyTradeCreate, StockTradeCreate, AccountTransferCreate
-from typing import Dict, List
+from src.trades.schemas import MoneyTradeCreate, StockTradeCreate, AccountTransferCreate, TradeResponse
+from src.feeds.leaderboard import LeaderboardService
+from src.feeds.profiles import invalidate_profiles
+from src.feeds.stream import activity_hub, trade_event
+from src.users.models import User
+from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+CREDIT_TYPES = ["DEPOSIT", "SELL_STOCK", "TRANSFER_IN"]
+DEBIT_TYPES = ["WITHDRAW", "BUY_STOCK", "TRANSFER_OUT"]
+
 
 class TradeService:
+    @staticmethod
+    def signed_amount():
+        return case(
+            (Trade.type.in_(CREDIT_TYPES), Trade.amount),
+            (Trade.type.in_(DEBIT_TYPES), -Trade.amount),
+            else_=0.0,
+        )
+
+    @staticmethod
+    async def calculate_balances(account_ids: List[int], session: AsyncSession) -> Dict[int, float]:
+        balances = {account_id: 0.0 for account_id in account_ids}
+        if not balances:
+            return balances
+        query = (
+            select(Trade.account_id, func.coalesce(func.sum(TradeService.signed_amount()), 0.0))
+            .where(Trade.account_id.in_(balances))
+            .group_by(Trade.account_id)
+        )
+        result = await session.execute(query)
+        balances.update({account_id: float(balance) for account_id, balance in result.all()})
+        return balances
+
+    @staticmethod
+    async def ledger_version(account_id: int, session: AsyncSession) -> Optional[tuple]:
+        # Trades are append-only per account, so the newest id and the row count
+        # change whenever the ledger does. The name covers account renames.
+        query = (
+            select(Account.name, func.count(Trade.id), func.max(Trade.id))
+            .select_from(Account)
+            .outerjoin(Trade, Trade.account_id == Account.id)
+            .where(Account.id == account_id)
+            .group_by(Account.id, Account.name)
+        )
+        result = await session.execute(query)
+        row = result.first()
+        return tuple(row) if row else None
+
     @staticmethod
     async def calculate_balance(account_id: int, session: AsyncSession) -> float:
-        query = select(Trade).where(Trade.account_id == account_id)
-        result = await session.scalars(query)
-        trades = result.all()
-        
-        balance = 0.0
-        for trade in trades:
-            if trade.type in ["DEPOSIT", "SELL_STOCK", "TRANSFER_IN"]:
-                balance += trade.amount
-            elif trade.type in ["WITHDRAW", "BUY_STOCK", "TRANSFER_OUT"]:
-                balance -= trade.amount
-        
-        return balance
+        balances = await TradeService.calculate_balances([account_id], session)
+        return balances[account_id]
 
     @staticmethod
     async def process_money_trade(payload: MoneyTradeCreate, session: AsyncSession) -> Trade:
@@ -63,11 +97,12 @@ class TradeService:
 
     @staticmethod
     async def process_stock_trade(payload: StockTradeCreate, session: AsyncSession) -> Trade:
-        account_query = select(Account).where(Account.id == payload.account_id)
-        account_result = await session.scalars(account_query)
-        account = account_result.first()
-        if not account:
+        account_query = select(Account, User.name).join(User, User.id == Account.user_id).where(Account.id == payload.account_id)
+        account_result = await session.execute(account_query)
+        account_row = account_result.first()
+        if not account_row:
             raise HTTPException(status_code=404, detail="Account not found")
+        account, trader_name = account_row
         
         stock_query = select(Stock).where(Stock.id == payload.stock_id)
         stock_result = await session.scalars(stock_query)
@@ -121,9 +156,13 @@ class TradeService:
             payload.type, 
             session
         )
+        await session.flush()
+        await LeaderboardService.refresh_users([account.user_id], session)
         
         await session.commit()
+        invalidate_profiles([account.user_id])
         await session.refresh(new_trade)
+        activity_hub.publish(trade_event(new_trade, account.user_id, trader_name, stock))
         return new_trade
 
     @staticmethod
@@ -249,15 +288,15 @@ class TradeService:
         account_id: int, 
         session: AsyncSession, 
         trade_type: str | None = None
-    ) -> list[Trade]:
-        query = select(Trade).where(Trade.account_id == account_id)
+    ) -> list[dict]:
+        query = select(*(getattr(Trade, field) for field in TradeResponse.model_fields)).where(Trade.account_id == account_id)
         
         if trade_type:
             query = query.where(Trade.type == trade_type)
         
         query = query.order_by(Trade.timestamp.desc())
-        result = await session.scalars(query)
-        return list(result.all())
+        result = await session.execute(query)
+        return [dict(row) for row in result.mappings()]
 
     @staticmethod
     async def get_account_transfers(account_id: int, session: AsyncSession) -> List[Dict]:
@@ -11,8 +11,8 @@ class User(Base):
     name: Mapped[str] = mapped_column(Text)
     email: Mapped[str] = mapped_column(Text, unique=True, index=True)
     type: Mapped[str] = mapped_column(Text, default="user")
-    password: Mapped[str] = mapped_column(Text)  # TODO: Hash passwords
+    password: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     #Relationships-Parent
-    accounts: Mapped[list["Account"]] = relationship("Account",back_populates="user",cascade="all, delete-orphan")  # type: ignore
\ No newline at end of file
+    accounts: Mapped[list["Account"]] = relationship("Account",back_populates="user",cascade="all, delete-orphan", passive_deletes=True)  # type: ignore
\ No newline at end of file
@@ -1,19 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database import get_async_session
 from src.users.models import User
-from src.users.schemas import (UserResponse, UserCreate, UserUpdate, UserDetailResponse, UserLogin)
+from src.users.schemas import (UserResponse, UserCreate, UserUpdate, UserDetailResponse, UserLogin, UserPortfolioResponse)
 from src.users.services import UserService
 from src.accounts.services import AccountService
+from src.pagination import PageParams
 
 router = APIRouter(prefix="/users",tags=["Users"])
 
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(session: AsyncSession = Depends(get_async_session)):
-    users = await UserService.get_all_users(session)
-    return users
+async def get_users(
+    response: Response,
+    type: str | None = Query(None, description="Only users of this type"),
+    email: str | None = Query(None, description="Only users whose email contains this text"),
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session)):
+    users = await UserService.get_all_users(session, type, email, page)
+    users.apply_headers(response)
+    return users.items
 
 @router.post("/", response_model=UserResponse, status_code=201)
 async def create_user(payload: UserCreate, session: AsyncSession = Depends(get_async_session)):
@@ -30,6 +37,11 @@ async def get_user_details(user_id: int, session: AsyncSession = Depends(get_asy
     details = await UserService.get_user_with_details(user_id, session)
     return details
 
+@router.get("/{user_id}/portfolio", response_model=UserPortfolioResponse)
+async def get_user_portfolio(user_id: int, session: AsyncSession = Depends(get_async_session)):
+    portfolio = await UserService.get_user_portfolio(user_id, session)
+    return portfolio
+
 @router.get("/{user_id}/accounts")
 async def get_user_accounts(user_id: int, session: AsyncSession = Depends(get_async_session)):
     accounts = await AccountService.get_user_accounts(user_id, session)
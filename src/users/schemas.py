@@ -42,6 +42,30 @@ class UserDetailResponse(UserResponse):
     total_accounts: int = Field(..., description="Number of accounts user owns")
     total_portfolio_value: float = Field(..., description="Combined value of all accounts")
 
+class ConsolidatedHoldingResponse(CustomBase):
+    stock_id: PositiveInt
+    stock_name: str
+    stock_ticker: Optional[str] = None
+    accounts: int = Field(..., description="Number of the user's accounts holding this stock")
+    quantity: float
+    average_purchase_price: float
+    current_market_price: float
+    total_invested: float
+    current_value: float
+    unrealized_profit_loss: float
+    unrealized_profit_loss_percentage: float
+
+class UserPortfolioResponse(CustomBase):
+    user_id: PositiveInt
+    total_accounts: int
+    cash_balance: float = Field(..., description="Combined cash across all accounts")
+    total_invested: float
+    holdings_value: float
+    total_value: float = Field(..., description="Cash plus current value of all holdings")
+    unrealized_profit_loss: float
+    unrealized_profit_loss_percentage: float
+    holdings: list[ConsolidatedHoldingResponse] = Field(default_factory=list, description="Holdings merged across accounts, largest first")
+
 class UserWithAccountsResponse(UserResponse):
     accounts: list = Field(default_factory=list, description="List of user's accounts")
 
@@ -0,0 +1,78 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import settings
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# hashlib.scrypt releases the GIL, so hashing runs in threads off the event loop.
+# The pool size caps how many hashes run at once, and with it scrypt's memory use.
+_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES)
+
+
+def hash_password_sync(password: str) -> str:
+    n, r, p = settings.password_scrypt_n, settings.password_scrypt_r, settings.password_scrypt_p
+    salt = os.urandom(SALT_BYTES)
+    return f"{SCHEME}${n}${r}${p}${_b64encode(salt)}${_b64encode(_scrypt(password, salt, n, r, p))}"
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(f"{SCHEME}$")
+
+
+def verify_password_sync(password: str, stored: str) -> bool:
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    try:
+        _, n, r, p, salt, expected = stored.split("$")
+        derived = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(derived, _b64decode(expected))
+
+
+def needs_rehash(stored: str) -> bool:
+    if not is_hashed(stored):
+        return True
+    _, n, r, p, _, _ = stored.split("$")
+    return (int(n), int(r), int(p)) != (settings.password_scrypt_n, settings.password_scrypt_r, settings.password_scrypt_p)
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, hash_password_sync, password)
+
+
+async def verify_password(password: str, stored: str) -> bool:
+    if not is_hashed(stored):
+        return verify_password_sync(password, stored)
+    return await asyncio.get_running_loop().run_in_executor(_executor, verify_password_sync, password, stored)
+
+
+_dummy_hash = None
+
+
+async def burn_verification(password: str):
+    # Unknown emails still pay for one hash so response time does not reveal
+    # which addresses are registered.
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await hash_password(os.urandom(SALT_BYTES).hex())
+    await verify_password(password, _dummy_hash)
@@ -1,11 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from src.users.models import User
 from src.users.schemas import UserCreate, UserUpdate, UserDetailResponse
+from src.users.security import hash_password, verify_password, needs_rehash, burn_verification
+from src.pagination import Page, PageParams, paginate
 from typing import Optional
 
+USER_SORT_FIELDS = {"id": User.id, "name": User.name, "email": User.email, "created_at": User.created_at}
+
 
 class UserService:
     @staticmethod
@@ -15,7 +19,7 @@ class UserService:
         existing_user = existing_result.first()
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
-        new_user = User(name=payload.name, email=payload.email, password=payload.password, type=payload.type or "user")
+        new_user = User(name=payload.name, email=payload.email, password=await hash_password(payload.password), type=payload.type or "user")
         session.add(new_user)
         try:
             await session.commit()
@@ -41,10 +45,13 @@ class UserService:
         return result.first()
 
     @staticmethod
-    async def get_all_users(session: AsyncSession) -> list[User]:
+    async def get_all_users(session: AsyncSession, user_type: Optional[str] = None, email: Optional[str] = None, page: Optional[PageParams] = None) -> Page:
         query = select(User)
-        result = await session.scalars(query)
-        return list(result.all())
+        if user_type:
+            query = query.where(User.type == user_type)
+        if email:
+            query = query.where(User.email.ilike(f"%{email}%"))
+        return await paginate(session, query, User.id, USER_SORT_FIELDS, page)
 
     @staticmethod
     async def update_user(user_id: int, payload: UserUpdate, session: AsyncSession) -> User:
@@ -55,6 +62,8 @@ class UserService:
             existing_result = await session.scalars(existing_query)
             if existing_result.first():
                 raise HTTPException(status_code=400, detail="Email already in use by another user")
+        if update_data.get("password"):
+            update_data["password"] = await hash_password(update_data["password"])
         for field, value in update_data.items():
             setattr(user, field, value)
         try:
@@ -67,43 +76,85 @@ class UserService:
 
     @staticmethod
     async def delete_user(user_id: int, session: AsyncSession) -> None:
-        user = await UserService.get_user_by_id(user_id, session)
-        await session.delete(user)
+        from src.feeds.profiles import invalidate_profiles
+        from src.feeds.trending import invalidate_trending
+        await UserService.get_user_by_id(user_id, session)
+        await session.execute(delete(User).where(User.id == user_id))
         await session.commit()
+        invalidate_profiles([user_id])
+        await invalidate_trending([user_id])
 
     @staticmethod
-    async def get_user_with_details(user_id: int, session: AsyncSession) -> UserDetailResponse:
+    async def _cash_and_holdings(user_id: int, session: AsyncSession) -> tuple[list[int], float, list]:
         from src.accounts.models import Account
         from src.trades.services import TradeService
         from src.positions.services import PositionService
+        accounts_result = await session.scalars(select(Account.id).where(Account.user_id == user_id))
+        account_ids = list(accounts_result.all())
+        balances = await TradeService.calculate_balances(account_ids, session)
+        holdings_result = await session.execute(PositionService.holdings_query(Account.user_id == user_id))
+        return account_ids, sum(balances.values()), holdings_result.all()
+
+    @staticmethod
+    async def get_user_with_details(user_id: int, session: AsyncSession) -> UserDetailResponse:
         user = await UserService.get_user_by_id(user_id, session)
-        accounts_query = select(Account).where(Account.user_id == user_id)
-        accounts_result = await session.scalars(accounts_query)
-        accounts = list(accounts_result.all())
-        total_value = 0.0
-        for account in accounts:
-            balance = await TradeService.calculate_balance(account.id, session)
-            try:
-                portfolio = await PositionService.get_portfolio_summary(account.id, session)
-                portfolio_value = portfolio.current_portfolio_value
-            except Exception:
-                portfolio_value = 0.0
-            total_value += balance + portfolio_value
+        account_ids, cash_balance, holdings = await UserService._cash_and_holdings(user_id, session)
         return UserDetailResponse(
             id=user.id,
             name=user.name,
             email=user.email,
             type=user.type,
             created_at=user.created_at,
-            total_accounts=len(accounts),
-            total_portfolio_value=total_value
+            total_accounts=len(account_ids),
+            total_portfolio_value=cash_balance + sum(holding.current_value for holding in holdings)
         )
 
+    @staticmethod
+    async def get_user_portfolio(user_id: int, session: AsyncSession) -> dict:
+        await UserService.get_user_by_id(user_id, session)
+        account_ids, cash_balance, holdings = await UserService._cash_and_holdings(user_id, session)
+        total_invested = 0.0
+        holdings_value = 0.0
+        consolidated = []
+        for holding in holdings:
+            total_invested += holding.total_invested
+            holdings_value += holding.current_value
+            profit_loss = holding.current_value - holding.total_invested
+            consolidated.append({
+                "stock_id": holding.stock_id,
+                "stock_name": holding.stock_name,
+                "stock_ticker": holding.stock_ticker,
+                "accounts": holding.accounts,
+                "quantity": holding.quantity,
+                "average_purchase_price": holding.total_invested / holding.quantity if holding.quantity else 0.0,
+                "current_market_price": holding.current_market_price,
+                "total_invested": holding.total_invested,
+                "current_value": holding.current_value,
+                "unrealized_profit_loss": profit_loss,
+                "unrealized_profit_loss_percentage": (profit_loss / holding.total_invested * 100) if holding.total_invested > 0 else 0
+            })
+        total_profit_loss = holdings_value - total_invested
+        return {
+            "user_id": user_id,
+            "total_accounts": len(account_ids),
+            "cash_balance": cash_balance,
+            "total_invested": total_invested,
+            "holdings_value": holdings_value,
+            "total_value": cash_balance + holdings_value,
+            "unrealized_profit_loss": total_profit_loss,
+            "unrealized_profit_loss_percentage": (total_profit_loss / total_invested * 100) if total_invested > 0 else 0,
+            "holdings": consolidated
+        }
+
     @staticmethod
     async def verify_password(email: str, password: str, session: AsyncSession) -> Optional[User]:
         user = await UserService.get_user_by_email(email, session)
         if not user:
+            await burn_verification(password)
             return None
-        if password != user.password:
+        if not await verify_password(password, user.password):
             return None
+        if needs_rehash(user.password):
+            user.password = await hash_password(password)
+            await session.commit()
         return user
\ No newline at end of file